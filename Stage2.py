@@ -1,193 +1,393 @@
-import configparser
-import os
+import re
 import sys
-import argparse
-from pathlib import Path
-from typing import Dict, Any, List
-import urllib.request  # Для выполнения HTTP-запросов
-import urllib.error  # Для обработки HTTP-ошибок
-import xml.etree.ElementTree as ET  # Для парсинга XML-содержимого POM-файлов
+import threading
+from typing import BinaryIO, Dict, Iterable, Iterator, List, NamedTuple, Tuple
+
+# Тяжелые модули (http.client тянет ssl и email, concurrent.futures, repo_core, XML-парсер)
+# импортируются в тех функциях, где нужны: запуск с --help или с ошибкой конфигурации
+# не тратит на них время
+
+# Конфигурация загружается общим с Stage1 модулем
+from config_core import ConfigError, DependencyGraphConfig
+
+# Модуль XML-парсера, загружается при первом разборе (см. _etree)
+_ET = None
+
+# Параметры парсера lxml: внешние сущности не подставляются и не загружаются по сети (защита от XXE,
+# до lxml 5 подстановка включена по умолчанию). xml.etree.ElementTree внешние сущности не загружает
+_LXML_PARSER_OPTIONS = {'resolve_entities': False, 'no_network': True}
+
+# Общий парсер lxml для maven-metadata.xml (None - lxml не установлен или еще не загружен, см. _etree)
+_LXML_PARSER = None
+
+# Число потоков для пакетной загрузки POM-файлов
+_FETCH_WORKERS = 16
+
+# Теги POM-файла с namespace, вычисляются один раз при импорте
+_POM_NS = 'http://maven.apache.org/POM/4.0.0'
+_POM_NS_PREFIX = '{http://maven.apache.org/POM/'
+_POM_NS_PREFIX_LEN = len(_POM_NS_PREFIX)
+_DEPENDENCIES_TAG = f'{{{_POM_NS}}}dependencies'
+_DEPENDENCY_TAG = f'{{{_POM_NS}}}dependency'
+_GROUP_ID_TAG = f'{{{_POM_NS}}}groupId'
+_ARTIFACT_ID_TAG = f'{{{_POM_NS}}}artifactId'
+_VERSION_TAG = f'{{{_POM_NS}}}version'
+_FIELD_TAGS = {_GROUP_ID_TAG: 'groupId', _ARTIFACT_ID_TAG: 'artifactId', _VERSION_TAG: 'version'}
+
+# Размер порции, которой поток POM-файла подается парсеру
+_PARSE_CHUNK_SIZE = 32 * 1024
+
+# Диапазон версий Maven: [1.0,2.0), (,1.5], [1.2] и их объединения через запятую
+_VERSION_RANGE_RE = re.compile(r'([\[(])([^\[\]()]*)([\])])')
+
+# Порядок квалификаторов версий Maven (неизвестные квалификаторы идут после известных, по алфавиту)
+_QUALIFIER_ORDER = {'alpha': 0, 'a': 0, 'beta': 1, 'b': 1, 'milestone': 2, 'm': 2, 'rc': 3, 'cr': 3,
+                    'snapshot': 4, '': 5, 'ga': 5, 'final': 5, 'release': 5, 'sp': 6}
+_UNKNOWN_QUALIFIER = 7
+# ga, final и release обозначают сам релиз: 1.0-final == 1.0-ga == 1.0
+_RELEASE_QUALIFIER = _QUALIFIER_ORDER['']
+
+
+class Dep(NamedTuple):
+    #Запись о зависимости: кортеж из трех строк вместо словаря (меньше памяти, доступ по атрибутам)
+    groupId: str
+    artifactId: str
+    version: str
+
+
+class _DependencyTarget:
+    #Обработчик событий XML-парсера: собирает зависимости из первой секции dependencies без построения дерева.
+
+    def __init__(self):
+        self.dependencies = []
+        # Секция dependencies найдена / уже закрыта (дальше документ не нужен)
+        self.found = False
+        self.done = False
+
+        self._depth = 0
+        self._dependencies_depth = -1
+        # Поля текущей зависимости, имя собираемого поля и части его текста
+        self._fields = None
+        self._field = None
+        self._text = []
+
+    def start(self, tag, attrib):
+        depth = self._depth
+        self._depth = depth + 1
+        if self.done:
+            return
+
+        # Проверка namespace POM-файла по корневому элементу
+        if depth == 0 and tag[:_POM_NS_PREFIX_LEN] != _POM_NS_PREFIX:
+            raise ConfigError("Некорректный формат POM файла: отсутствует ожидаемый namespace")
+
+        # Запоминаем первую секцию dependencies в порядке документа
+        if not self.found:
+            if tag == _DEPENDENCIES_TAG:
+                self.found = True
+                self._dependencies_depth = depth
+
+        # Элемент dependency, непосредственно вложенный в секцию dependencies
+        elif depth == self._dependencies_depth + 1:
+            if tag == _DEPENDENCY_TAG:
+                self._fields = {}
+
+        # groupId, artifactId или version внутри зависимости (учитывается первое вхождение)
+        elif depth == self._dependencies_depth + 2 and self._fields is not None:
+            field = _FIELD_TAGS.get(tag)
+            if field is not None and field not in self._fields:
+                self._field = field
+                self._text = []
+
+    def data(self, text):
+        # Собираем только текст самого поля, без вложенных элементов
+        if self._field is not None and self._depth == self._dependencies_depth + 3:
+            self._text.append(text)
+
+    def end(self, tag):
+        self._depth -= 1
+        depth = self._depth
+        if self.done or not self.found:
+            return
+
+        if self._field is not None and depth == self._dependencies_depth + 2:
+            self._fields[self._field] = ''.join(self._text)
+            self._field = None
+
+        elif depth == self._dependencies_depth + 1 and self._fields is not None:
+            fields = self._fields
+            self._fields = None
+            # Проверяем что все обязательные элементы присутствуют и не пусты
+            if fields.get('groupId') and fields.get('artifactId') and fields.get('version'):
+                # Формируем запись с информацией о зависимости. groupId и version часто совпадают
+                # у многих зависимостей - интернируем их, чтобы хранить одну копию строки
+                self.dependencies.append(Dep(
+                    sys.intern(fields['groupId'].strip()),
+                    fields['artifactId'].strip(),
+                    sys.intern(fields['version'].strip())
+                ))
+
+        # Секция dependencies закрылась
+        elif depth == self._dependencies_depth:
+            self.done = True
+
+    def close(self):
+        return self.dependencies
 
 
-# Пользовательское исключение для ошибок конфигурации
-class ConfigError(Exception):
-    pass
-class DependencyGraphConfig:
-    #Класс для работы с конфигурацией (практически идентичен Stage1).
+class DependencyFetcher:
+    #Новый класс: Получение информации о зависимостях Maven-пакетов.
 
-    def __init__(self, config_path: str = "config.ini"):
-        #Инициализация с путем к конфигурационному файлу
-        self.config_path = config_path
-        self.config = None
+    def __init__(self, repository_url: str):
+        #Инициализация загрузчика зависимостей.
 
-    def load_config(self) -> Dict[str, Any]:
-        #Загрузка конфигурации из INI-файла
-        config_parser = configparser.ConfigParser()
+        # Убираем конечный / для consistency URL
+        self.repository_url = repository_url.rstrip('/')
 
-        # Проверка существования файла
-        if not os.path.exists(self.config_path):
-            raise ConfigError(f"Конфигурационный файл '{self.config_path}' не найден")
+        # HTTP-клиент с постоянными соединениями (общий модуль repo_core, создается при первом запросе)
+        self._http = None
+        self._http_lock = threading.Lock()
 
-        try:
-            # Чтение с указанием кодировки UTF-8
-            config_parser.read(self.config_path, encoding='utf-8')
-        except configparser.Error as e:
-            raise ConfigError(f"Ошибка чтения конфигурационного файла: {e}")
-        except UnicodeDecodeError as e:
-            raise ConfigError(f"Ошибка кодировки конфигурационного файла: {e}")
+        # Пул потоков для пакетной загрузки (создается при первом обращении)
+        self._executor = None
 
-        # Проверка обязательной секции
-        if 'package' not in config_parser:
-            raise ConfigError("В конфигурационном файле отсутствует секция 'package'")
+        # Метаданные (latest, release, versions) по (groupId, artifactId) и результаты
+        # определения версий по (groupId, artifactId, спецификация версии)
+        self._metadata_cache: Dict[Tuple[str, str], tuple] = {}
+        self._version_cache: Dict[Tuple[str, str, str], str] = {}
 
-        package_section = config_parser['package']
-        config = {}
+        # Уже полученные зависимости по (имя пакета, версия) в пределах одного запуска.
+        # Возвращаемые списки общие для всех вызовов - вызывающий код не должен их изменять
+        self._memo: Dict[Tuple[str, str], List[Dep]] = {}
 
-        try:
-            # Обязательные параметры
-            config['name'] = self._get_required_parameter(package_section, 'name')
-            config['version'] = self._get_required_parameter(package_section, 'version')
-            config['repository_url'] = self._get_required_parameter(package_section, 'repository_url')
-
-            # Опциональные параметры
-            config['test_repository_mode'] = self._get_boolean_parameter(
-                package_section, 'test_repository_mode', False
-            )
-            config['test_repository_path'] = package_section.get(
-                'test_repository_path',
-                fallback='./test_repo'
-            )
-            config['output_filename'] = package_section.get(
-                'output_filename',
-                fallback='dependency_graph.png'
-            )
-            config['ascii_tree_mode'] = self._get_boolean_parameter(
-                package_section, 'ascii_tree_mode', False
-            )
-            config['package_filter'] = package_section.get(
-                'package_filter',
-                fallback=''
-            )
-
-        except (ValueError, configparser.NoOptionError) as e:
-            raise ConfigError(f"Ошибка в параметрах конфигурации: {e}")
-
-        # Валидация конфигурации
-        self._validate_config(config)
-        self.config = config
-        return config
-
-    def _get_required_parameter(self, section: configparser.SectionProxy, param: str) -> str:
-        #Получение обязательного параметра
-        if param not in section:
-            raise ConfigError(f"Обязательный параметр '{param}' отсутствует в конфигурационном файле")
-
-        value = section.get(param)
-        if not value or not value.strip():
-            raise ConfigError(f"Обязательный параметр '{param}' не указан или пуст")
-        return value.strip()
-
-    def _get_boolean_parameter(self, section: configparser.SectionProxy, param: str, default: bool) -> bool:
-        #Получение булевого параметра
-        if param not in section:
-            return default
-
-        value = section.get(param)
-        if value is None:
-            return default
-
-        if value.lower() in ('true', 'yes', '1', 'on'):
-            return True
-        elif value.lower() in ('false', 'no', '0', 'off'):
-            return False
-        else:
-            raise ConfigError(
-                f"Некорректное булево значение для параметра '{param}': '{value}'. Ожидается: true/false, yes/no, 1/0")
+    def get_dependencies(self, package_name: str, version: str) -> List[Dep]:
+        #Основной метод: получение прямых зависимостей пакета (повторные запросы берутся из памяти).
 
-    def _validate_config(self, config: Dict[str, Any]) -> None:
-        #Валидация значений конфигурации
-        if not config['name'].strip():
-            raise ConfigError("Имя пакета не может быть пустым")
+        key = (package_name, version)
+        dependencies = self._memo.get(key)
+        if dependencies is None:
+            dependencies = self._memo[key] = self._fetch_dependencies(package_name, version)
+        return dependencies
 
-        # Проверка формата имени пакета
-        name = config['name'].strip()
-        if ':' not in name:
-            raise ConfigError(f"Некорректный формат имени пакета: '{name}'. Ожидается: groupId:artifactId")
+    def _fetch_dependencies(self, package_name: str, version: str) -> List[Dep]:
+        #Получение прямых зависимостей пакета из кэша на диске или из репозитория.
 
-        if not config['version'].strip():
-            raise ConfigError("Версия пакета не может быть пустой")
+        import http.client
+        from repo_core import caching_reader
 
-        repo_url = config['repository_url'].strip()
-        if not repo_url:
-            raise ConfigError("URL репозитория не может быть пустым")
+        # Парсим имя пакета на составляющие
+        group_id, artifact_id = self._parse_package_name(package_name)
 
-        # Проверка протокола URL
-        if not (repo_url.startswith('http://') or repo_url.startswith('https://')):
-            raise ConfigError(f"Некорректный протокол URL репозитория: '{repo_url}'. Ожидается: http:// или https://")
+        # LATEST, RELEASE и диапазоны версий заменяются конкретной версией из maven-metadata.xml
+        version = self._resolve_version(group_id, artifact_id, version)
 
-        # Дополнительные проверки для тестового режима
-        if config['test_repository_mode']:
-            test_path = config['test_repository_path'].strip()
-            if not test_path:
-                raise ConfigError("Путь тестового репозитория не может быть пустым в тестовом режиме")
+        # Строим URL для POM-файла
+        pom_url = self._build_pom_url(group_id, artifact_id, version)
 
-        # Проверка имени выходного файла
-        output_file = config['output_filename'].strip()
-        if not output_file:
-            raise ConfigError("Имя выходного файла не может быть пустым")
+        # Если POM уже скачивался из этого репозитория - читаем его из локального кэша без обращения к сети
+        dependencies = self._load_cached_pom(pom_url)
+        if dependencies is not None:
+            return dependencies
 
-        # Проверка расширения файла
-        valid_extensions = {'.png', '.jpg', '.jpeg', '.svg', '.pdf'}
-        file_ext = Path(output_file).suffix.lower()
-        if file_ext not in valid_extensions:
-            raise ConfigError(f"Неподдерживаемое расширение файла: '{file_ext}'. "
-                              f"Допустимые: {', '.join(valid_extensions)}")
+        # Выводим информационное сообщение о загрузке
+        print(f"Загрузка POM из: {pom_url}")
 
+        try:
+            # Выполняем HTTP-запрос для получения POM-файла
+            response = self._open_url(pom_url)
+        except (OSError, http.client.HTTPException) as e:
+            # Ошибки сети
+            raise ConfigError(f"Ошибка подключения к репозиторию: {e}")
 
-class DependencyFetcher:
-    #Новый класс: Получение информации о зависимостях Maven-пакетов.
+        # Обработка HTTP-ошибок
+        if response.status != 200:
+            self._discard_response(response)
+            if response.status == 404:
+                # POM-файл не найден
+                raise ConfigError(f"POM файл не найден по URL: {pom_url}")
+            # Другие HTTP-ошибки
+            raise ConfigError(f"Ошибка загрузки POM файла: {response.status} {response.reason}")
 
-    def __init__(self, repository_url: str):
-        #Инициализация загрузчика зависимостей.
+        # Ответ параллельно с разбором сохраняется во временный файл кэша
+        stream = caching_reader(response, pom_url) or response
 
-        # Убираем конечный / для consistency URL
-        self.repository_url = repository_url.rstrip('/')
+        try:
+            with response:
+                # Парсим зависимости прямо из потока ответа: разбор идет по мере чтения,
+                # кодировку парсер берет из XML-декларации
+                dependencies = self._parse_dependencies_from_pom(stream)
+                # Дочитываем остаток ответа, чтобы соединение можно было использовать повторно
+                # (и чтобы в кэш попал весь файл)
+                stream.read()
+
+            # Атомарно помещаем полностью скачанный файл в кэш
+            if stream is not response:
+                stream.finish(True)
+            return dependencies
 
-    def get_dependencies(self, package_name: str, version: str) -> List[Dict[str, str]]:
-        #Основной метод: получение прямых зависимостей пакета.
+        except Exception as e:
+            if stream is not response:
+                stream.finish(False)
+            # Ответ прочитан не до конца - такое соединение повторно использовать нельзя
+            self._http.abandon()
+            # Все остальные непредвиденные ошибки
+            raise ConfigError(f"Ошибка обработки POM файла: {e}")
 
-        # Парсим имя пакета на составляющие
-        group_id, artifact_id = self._parse_package_name(package_name)
+    def get_dependencies_batch(self, coordinates: Iterable[Tuple[str, str]]) -> Dict[Tuple[str, str], List[Dep]]:
+        #Параллельное получение прямых зависимостей для набора пар (имя пакета, версия).
+
+        # Убираем повторы, сохраняя порядок
+        coordinates = list(dict.fromkeys(coordinates))
+
+        if self._executor is None:
+            from concurrent.futures import ThreadPoolExecutor
+            self._executor = ThreadPoolExecutor(max_workers=_FETCH_WORKERS)
+
+        # Запросы выполняются одновременно, ожидание сети перекрывается
+        results = self._executor.map(lambda coordinate: self.get_dependencies(*coordinate), coordinates)
+        return dict(zip(coordinates, results))
+
+    def resolve_transitive(self, root_name: str, root_version: str) -> Tuple[set, List[tuple]]:
+        #Итеративный обход транзитивных зависимостей в ширину: без рекурсии, каждый пакет загружается один раз.
+
+        root = (root_name, root_version)
+        seen = {root}
+        edges = []
+
+        # Очередь обхода хранится слоями: весь слой загружается одним параллельным пакетом
+        layer = [root]
+        while layer:
+            layer_dependencies = self.get_dependencies_batch(layer)
+            next_layer = []
+            for node in layer:
+                for dep in layer_dependencies[node]:
+                    child = (f"{dep.groupId}:{dep.artifactId}", dep.version)
+                    edges.append((node, child))
+                    if child not in seen:
+                        seen.add(child)
+                        next_layer.append(child)
+            layer = next_layer
+
+        return seen, edges
+
+    def close(self):
+        #Закрытие пула потоков и всех открытых соединений с репозиторием.
+
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+        if self._http is not None:
+            self._http.close()
+            self._http = None
+
+    def _open_url(self, url: str) -> 'http.client.HTTPResponse':
+        #GET-запрос через общий HTTP-клиент: постоянные соединения потоков, прокси из окружения,
+        #перенаправления и повторы при сетевых ошибках.
+
+        if self._http is None:
+            # Клиент создается один раз, даже если первые запросы идут сразу из нескольких потоков
+            with self._http_lock:
+                if self._http is None:
+                    from repo_core import HttpClient
+                    self._http = HttpClient()
+        return self._http.get(url)
+
+    def _discard_response(self, response: 'http.client.HTTPResponse'):
+        #Дочитывание ненужного тела ответа, чтобы освободить соединение.
+
+        self._http.discard(response)
+
+    def _resolve_version(self, group_id: str, artifact_id: str, version_spec: str) -> str:
+        #Определение конкретной версии для LATEST, RELEASE и диапазонов версий.
+
+        # Обычная версия используется как есть
+        if version_spec not in ('LATEST', 'RELEASE') and not version_spec.startswith(('[', '(')):
+            return version_spec
+
+        key = (group_id, artifact_id, version_spec)
+        resolved = self._version_cache.get(key)
+        if resolved is not None:
+            return resolved
+
+        latest, release, versions = self._get_metadata(group_id, artifact_id)
+
+        if version_spec == 'LATEST':
+            resolved = latest or (versions[-1] if versions else None)
+        elif version_spec == 'RELEASE':
+            resolved = release or next((v for v in reversed(versions) if not v.endswith('SNAPSHOT')), None)
+        else:
+            # Для диапазона берется наибольшая подходящая версия (SNAPSHOT не учитываются)
+            ranges = _parse_version_ranges(version_spec)
+            if not ranges:
+                raise ConfigError(f"Некорректный диапазон версий: {version_spec}")
+            candidates = [v for v in versions
+                          if not v.endswith('SNAPSHOT') and _version_in_ranges(_version_key(v), ranges)]
+            resolved = max(candidates, key=_version_key) if candidates else None
 
-        # Строим URL для POM-файла
-        pom_url = self._build_pom_url(group_id, artifact_id, version)
+        if not resolved:
+            raise ConfigError(f"Не найдена версия {version_spec} пакета {group_id}:{artifact_id}")
+
+        print(f"Версия {version_spec} пакета {group_id}:{artifact_id}: {resolved}")
+        self._version_cache[key] = resolved
+        return resolved
+
+    def _get_metadata(self, group_id: str, artifact_id: str) -> tuple:
+        #Загрузка maven-metadata.xml пакета (один раз на groupId:artifactId).
+
+        import http.client
+
+        key = (group_id, artifact_id)
+        metadata = self._metadata_cache.get(key)
+        if metadata is not None:
+            return metadata
+
+        ET = _etree()
+
+        metadata_url = f"{self.repository_url}/{group_id.replace('.', '/')}/{artifact_id}/maven-metadata.xml"
+        print(f"Загрузка метаданных из: {metadata_url}")
 
         try:
-            # Выводим информационное сообщение о загрузке
-            print(f"Загрузка POM из: {pom_url}")
+            response = self._open_url(metadata_url)
+        except (OSError, http.client.HTTPException) as e:
+            raise ConfigError(f"Ошибка подключения к репозиторию: {e}")
 
-            # Выполняем HTTP-запрос для получения POM-файла
-            with urllib.request.urlopen(pom_url) as response:
-                # Читаем и декодируем содержимое файла
-                pom_content = response.read().decode('utf-8')
+        if response.status != 200:
+            self._discard_response(response)
+            raise ConfigError(f"Ошибка загрузки метаданных пакета {group_id}:{artifact_id}: "
+                              f"{response.status} {response.reason}")
 
-            # Парсим зависимости из содержимого POM-файла
-            dependencies = self._parse_dependencies_from_pom(pom_content)
-            return dependencies
+        try:
+            with response:
+                root = ET.fromstring(response.read(), _LXML_PARSER)
+        except (OSError, http.client.HTTPException, ET.ParseError) as e:
+            self._http.abandon()
+            raise ConfigError(f"Ошибка обработки метаданных пакета {group_id}:{artifact_id}: {e}")
 
-        except urllib.error.HTTPError as e:
-            # Обработка HTTP-ошибок
-            if e.code == 404:
-                # POM-файл не найден
-                raise ConfigError(f"POM файл не найден по URL: {pom_url}")
-            else:
-                # Другие HTTP-ошибки
-                raise ConfigError(f"Ошибка загрузки POM файла: {e.code} {e.reason}")
-        except urllib.error.URLError as e:
-            # Ошибки сети
-            raise ConfigError(f"Ошибка подключения к репозиторию: {e.reason}")
+        # В maven-metadata.xml нет namespace: <metadata><versioning><latest/><release/><versions/>
+        latest = (root.findtext('versioning/latest') or '').strip()
+        release = (root.findtext('versioning/release') or '').strip()
+        versions = [elem.text.strip() for elem in root.iterfind('versioning/versions/version') if elem.text]
+
+        metadata = self._metadata_cache[key] = (latest, release, versions)
+        return metadata
+
+    def _load_cached_pom(self, pom_url: str):
+        #Разбор POM-файла из кэша (None - файла в кэше нет или запись устарела).
+
+        from repo_core import drop_cached_pom, open_cached_pom
+
+        pom_file = open_cached_pom(pom_url)
+        if pom_file is None:
+            return None
+
+        print(f"Загрузка POM из кэша: {pom_file.name}")
+        try:
+            with pom_file:
+                return self._parse_dependencies_from_pom(pom_file)
         except Exception as e:
-            # Все остальные непредвиденные ошибки
+            # Поврежденный файл удаляем из кэша, при следующем запросе POM будет скачан заново
+            drop_cached_pom(pom_url)
             raise ConfigError(f"Ошибка обработки POM файла: {e}")
 
     def _parse_package_name(self, package_name: str) -> tuple[str, str]:
@@ -207,68 +407,130 @@ class DependencyFetcher:
         # Строим URL по Maven-конвенции
         return f"{self.repository_url}/{group_path}/{artifact_id}/{version}/{artifact_id}-{version}.pom"
 
-    def _parse_dependencies_from_pom(self, pom_content: str) -> List[Dict[str, str]]:
+    def iter_dependencies(self, pom_stream: BinaryIO) -> Iterator[Dep]:
+        #Генератор прямых зависимостей из потока POM-файла: каждая отдается сразу после разбора,
+        #без накопления полного списка.
+
+        yield from self._iter_parsed(pom_stream, _DependencyTarget())
+
+    def _parse_dependencies_from_pom(self, pom_stream: BinaryIO) -> List[Dep]:
         #Парсинг зависимостей из содержимого POM-файла.
 
+        target = _DependencyTarget()
+        dependencies = list(self._iter_parsed(pom_stream, target))
+
+        # Если секция dependencies отсутствует, возвращаем пустой список
+        if not target.found:
+            print("В POM файле не найдены зависимости")
+            return []
+
+        # Выводим информационное сообщение о количестве найденных зависимостей
+        print(f"Найдено зависимостей: {len(dependencies)}")
+        return dependencies
+
+    def _iter_parsed(self, pom_stream: BinaryIO, target: _DependencyTarget) -> Iterator[Dep]:
+        #Подача потока парсеру и выдача зависимостей, собранных target, по мере разбора.
+
+        ET = _etree()
+
+        # Дерево XML не строится: парсер вызывает методы target, которые собирают только нужные поля.
+        # Парсер с target у каждого разбора свой, параметры lxml - те же, что у _LXML_PARSER
+        if _LXML_PARSER is not None:
+            parser = ET.XMLParser(target=target, **_LXML_PARSER_OPTIONS)
+        else:
+            parser = ET.XMLParser(target=target)
+        parsed = target.dependencies
+
         try:
-            # Парсим XML из строки
-            root = ET.fromstring(pom_content)
-
-            # Проверка namespace POM-файла
-            if not root.tag.startswith('{http://maven.apache.org/POM/'):
-                raise ConfigError("Некорректный формат POM файла: отсутствует ожидаемый namespace")
-
-            # Ищем секцию dependencies в POM-файле
-            dependencies_elem = root.find('.//{http://maven.apache.org/POM/4.0.0}dependencies')
-
-            # Если секция dependencies отсутствует, возвращаем пустой список
-            if dependencies_elem is None:
-                print("В POM файле не найдены зависимости")
-                return []
-
-            dependencies = []
-
-            # Итерируемся по всем элементам dependency внутри секции dependencies
-            for dep_elem in dependencies_elem.findall('{http://maven.apache.org/POM/4.0.0}dependency'):
-                # Извлекаем groupId, artifactId и version для каждой зависимости
-                group_id = dep_elem.find('{http://maven.apache.org/POM/4.0.0}groupId')
-                artifact_id = dep_elem.find('{http://maven.apache.org/POM/4.0.0}artifactId')
-                version_elem = dep_elem.find('{http://maven.apache.org/POM/4.0.0}version')
-
-                # Проверяем что все обязательные элементы присутствуют и не пусты
-                if (group_id is not None and artifact_id is not None and version_elem is not None and
-                        group_id.text and artifact_id.text and version_elem.text):
-                    # Формируем словарь с информацией о зависимости
-                    dependencies.append({
-                        'groupId': group_id.text.strip(),
-                        'artifactId': artifact_id.text.strip(),
-                        'version': version_elem.text.strip()
-                    })
-
-            # Выводим информационное сообщение о количестве найденных зависимостей
-            print(f"Найдено зависимостей: {len(dependencies)}")
-            return dependencies
+            # Подаем поток парсеру кусками по мере чтения; после закрытия секции dependencies
+            # остаток документа не читаем
+            while not target.done:
+                chunk = pom_stream.read(_PARSE_CHUNK_SIZE)
+                if not chunk:
+                    parser.close()
+                    break
+                parser.feed(chunk)
+
+                # Отдаем зависимости, разобранные из этой порции, и освобождаем буфер
+                if parsed:
+                    yield from parsed
+                    parsed.clear()
 
         except ET.ParseError as e:
             # Ошибка парсинга XML
             raise ConfigError(f"Ошибка парсинга POM файла: {e}")
 
+        yield from parsed
+        parsed.clear()
 
-def print_config_summary(config: Dict[str, Any]) -> None:
-    #Функция для вывода сводки конфигурации
 
-    print("-" * 50)
-    print("СВОДКА КОНФИГУРАЦИИ")
-    print("-" * 50)
+def _etree():
+    #Загрузка XML-парсера при первом обращении: lxml, если установлен, иначе xml.etree.ElementTree.
+    global _ET, _LXML_PARSER
+
+    if _ET is None:
+        try:
+            # lxml разбирает XML средствами libxml2 (быстрее), API совместим с ElementTree
+            from lxml import etree as _ET
+            _LXML_PARSER = _ET.XMLParser(**_LXML_PARSER_OPTIONS)
+        except ImportError:
+            import xml.etree.ElementTree as _ET  # Для парсинга XML-содержимого POM-файлов
+    return _ET
 
-    for key, value in config.items():
-        print(f"{key:<25}: {value}")
 
-    print("-" * 50)
+def _version_key(version: str) -> tuple:
+    #Ключ сравнения версий в духе Maven: числа сравниваются как числа, квалификаторы - по _QUALIFIER_ORDER.
+
+    key = []
+    for part in re.findall(r'\d+|[a-z]+', version.lower()):
+        if part.isdigit():
+            key.append((1, int(part), ''))
+        else:
+            # Хвостовые нули перед квалификатором не значимы: 1.0-rc1 == 1-rc1
+            while key and key[-1] == (1, 0, ''):
+                key.pop()
+            # Синонимы равны (alpha == a, rc == cr); по имени сравниваются только неизвестные квалификаторы
+            order = _QUALIFIER_ORDER.get(part, _UNKNOWN_QUALIFIER)
+            if order != _RELEASE_QUALIFIER:
+                key.append((0, order, part if order == _UNKNOWN_QUALIFIER else ''))
+
+    # Завершаем ключ "релизом": 1.0 > 1.0-rc1, 1.0.1 > 1.0, 1.0 == 1.0.0
+    while key and key[-1] == (1, 0, ''):
+        key.pop()
+    key.append((0, _RELEASE_QUALIFIER, ''))
+    return tuple(key)
+
+
+def _parse_version_ranges(version_spec: str) -> List[tuple]:
+    #Разбор спецификации диапазонов в список (нижняя граница, включена, верхняя граница, включена).
+
+    ranges = []
+    for opening, body, closing in _VERSION_RANGE_RE.findall(version_spec):
+        low, comma, high = body.partition(',')
+        if not comma:
+            # [1.2] - ровно одна версия
+            high = low
+        low, high = low.strip(), high.strip()
+        ranges.append((_version_key(low) if low else None, opening == '[',
+                       _version_key(high) if high else None, closing == ']'))
+    return ranges
+
+
+def _version_in_ranges(key: tuple, ranges: List[tuple]) -> bool:
+    #Проверка попадания версии хотя бы в один из диапазонов.
+
+    for low, low_inclusive, high, high_inclusive in ranges:
+        if low is not None and (key < low or (key == low and not low_inclusive)):
+            continue
+        if high is not None and (key > high or (key == high and not high_inclusive)):
+            continue
+        return True
+    return False
 
 
 def parse_arguments():
-    #Парсинг аргументов командной строки
+    #Парсинг аргументов командной строки (argparse нужен только здесь)
+    import argparse
 
     parser = argparse.ArgumentParser(description='Этап 2: Получение прямых зависимостей пакета')
     parser.add_argument(
@@ -284,13 +546,13 @@ def main():
     #Основная функция приложения
 
     try:
-        # Парсинг аргументов командной строки
-        args = parse_arguments()
+        # Парсинг аргументов командной строки (без аргументов - config.ini, argparse не нужен)
+        config_path = 'config.ini' if len(sys.argv) == 1 else parse_arguments().config
 
         # Загрузка конфигурации (унаследовано из Stage1)
-        config_manager = DependencyGraphConfig(args.config)
+        config_manager = DependencyGraphConfig(config_path)
         config = config_manager.load_config()
-        print_config_summary(config)
+        config_manager.print_summary()
 
         # Получение зависимостей
         print("\n" + "-" * 50)
@@ -298,17 +560,19 @@ def main():
         print("-" * 50)
 
         # Создаем загрузчик зависимостей с URL репозитория
-        fetcher = DependencyFetcher(config['repository_url'])
+        fetcher = DependencyFetcher(config.repository_url)
 
         # Получаем зависимости для указанного пакета и версии
-        dependencies = fetcher.get_dependencies(config['name'], config['version'])
+        dependencies = fetcher.get_dependencies(config.name, config.version)
 
         # Вывод результатов
         if dependencies:
             print(f"Найдено зависимостей: {len(dependencies)}")
-            # Нумерованный список всех зависимостей
-            for i, dep in enumerate(dependencies, 1):
-                print(f"{i}. {dep['groupId']}:{dep['artifactId']}:{dep['version']}")
+            # Нумерованный список всех зависимостей - собираем целиком и выводим одной записью
+            sys.stdout.write("\n".join([
+                *(f"{i}. {dep.groupId}:{dep.artifactId}:{dep.version}" for i, dep in enumerate(dependencies, 1)),
+                "",
+            ]))
         else:
             print("Прямые зависимости не найдены")
 
@@ -1,10 +1,49 @@
 import configparser
+import http.client
 import os
 import sys
-import urllib.request
-import urllib.error
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import xml.etree.ElementTree as ET
-from typing import Dict, List, Set, Any
+from typing import Dict, List, Optional, Set, Any, Tuple, Union
+
+#HTTP-клиент и кэш POM-файлов общие для этапов 2-4 (постоянные соединения, прокси, повторы при сетевых ошибках)
+from repo_core import HttpClient, drop_cached_pom, open_cached_pom, store_cached_pom
+
+try:
+    # lxml разбирает XML средствами libxml2 (быстрее); без него используется xml.etree.ElementTree
+    from lxml import etree as _lxml_etree
+except ImportError:
+    _lxml_etree = None
+
+#Значения логических параметров, трактуемые как "включено"
+_TRUE_VALUES = frozenset({'true', 'yes', '1', 'on'})
+
+#Префиксы служебных узлов графа (циклы, ошибки, отфильтрованные пакеты)
+_MARKER_PREFIXES = ("CYCLE:", "ERROR:", "FILTERED")
+
+#Число параллельных загрузок POM-файлов при предварительной выборке
+_FETCH_WORKERS = 16
+
+#Namespace POM-файла и полные имена тегов (строятся один раз при импорте, а не при каждом разборе)
+_POM_NS = 'http://maven.apache.org/POM/4.0.0'
+_NS = '{' + _POM_NS + '}'
+_TAG_DEPS = './/' + _NS + 'dependencies'  # Путь поиска первой секции dependencies
+_TAG_DEP = _NS + 'dependency'
+_TAG_G = _NS + 'groupId'
+_TAG_A = _NS + 'artifactId'
+_TAG_V = _NS + 'version'
+
+#Ошибки разбора XML обоих парсеров и заранее скомпилированный XPath зависимостей для lxml:
+#dependency - прямые потомки первой секции dependencies (как root.find(...).findall(...))
+if _lxml_etree is not None:
+    _XML_ERRORS = (ET.ParseError, _lxml_etree.XMLSyntaxError)
+    #Парсер lxml без подстановки внешних сущностей и без загрузки по сети (защита от XXE,
+    #до lxml 5 подстановка включена по умолчанию); xml.etree.ElementTree внешние сущности не загружает
+    _LXML_PARSER = _lxml_etree.XMLParser(resolve_entities=False, no_network=True)
+    _DEPENDENCY_XPATH = _lxml_etree.XPath("(.//pom:dependencies)[1]/pom:dependency",
+                                          namespaces={'pom': _POM_NS})
+else:
+    _XML_ERRORS = (ET.ParseError,)
 
 
 class DependencyGraph:
@@ -15,14 +54,42 @@ class DependencyGraph:
         #Инициализация графа зависимостей.
         self.graph: Dict[str, List[str]] = {}  # Основная структура графа
         self.visited: Set[str] = set()  # Посещенные узлы
-        self.visiting: List[str] = []  # Текущий путь обхода (стек)
+        self.visiting: Dict[str, int] = {}  # Текущий путь обхода: пакет -> позиция в стеке обхода
         self.cycles: Dict[str, Set[str]] = {}  # Обнаруженные циклы
         self.original_dependencies: Dict[str, List[str]] = {}  # Оригинальные зависимости
 
+        #Состояние алгоритма Тарьяна (поиск компонент сильной связности)
+        self.index: Dict[str, int] = {}  # Порядковый номер обнаружения пакета
+        self.lowlink: Dict[str, int] = {}  # Минимальный номер, достижимый из поддерева пакета
+        self._tarjan_stack: List[str] = []  # Пакеты еще не выделенных компонент
+        self._on_tarjan_stack: Set[str] = set()
+        self._cycle_paths: Dict[str, List[str]] = {}  # Первый найденный путь цикла по пакету, замыкающему цикл
+
+        #Корень графа: пакет, с которого начато первое построение
+        self._root: Optional[str] = None
+
+        #Отсортированные пакеты графа для вывода (None - граф изменился после сортировки)
+        self._sorted_keys: Optional[List[str]] = None
+
+        #Разобранный фильтр пакетов: исходная строка и подстроки из нее
+        self._filter_source: str = ""
+        self._filter_tuple: Tuple[str, ...] = ()
+
+        #Разобранные тестовые файлы: абсолютный путь -> (время изменения, пакет -> зависимости)
+        self._test_graph_cache: Dict[str, Tuple[float, Dict[str, List[str]]]] = {}
+
+        #HTTP-клиент с постоянными соединениями потоков
+        self._http = HttpClient()
+
+        #Кэш зависимостей из репозитория: (пакет, версия, URL репозитория) -> зависимости
+        #или ошибка предварительной загрузки (повторно не загружается, выводится при обходе)
+        self._dep_cache: Dict[Tuple[str, str, str], Union[List[str], Exception]] = {}
+
     def parse_config(self, config_path: str = "config.ini") -> Dict[str, Any]:
         #Упрощенный парсинг конфигурации для совместимости с этапами 1-2.
 
-        config_parser = configparser.ConfigParser()
+        # Без интерполяции: get() сводится к поиску в словаре, без regex-подстановок %(...)s
+        config_parser = configparser.RawConfigParser(interpolation=None)
 
         if not os.path.exists(config_path):
             raise ValueError(f"Конфигурационный файл не найден: {config_path}")
@@ -46,12 +113,10 @@ class DependencyGraph:
             config[param] = package_section[param].strip()
 
         # Опциональные параметры
-        config['test_repository_mode'] = package_section.get('test_repository_mode', 'false').lower() in ('true', 'yes',
-                                                                                                          '1', 'on')
+        config['test_repository_mode'] = package_section.get('test_repository_mode', 'false').lower() in _TRUE_VALUES
         config['test_repository_path'] = package_section.get('test_repository_path', './test_repo')
         config['package_filter'] = package_section.get('package_filter', '')
-        config['ascii_tree_mode'] = package_section.get('ascii_tree_mode', 'false').lower() in ('true', 'yes', '1',
-                                                                                                'on')
+        config['ascii_tree_mode'] = package_section.get('ascii_tree_mode', 'false').lower() in _TRUE_VALUES
         config['output_filename'] = package_section.get('output_filename', 'dependency_graph.png')
 
         return config
@@ -62,23 +127,53 @@ class DependencyGraph:
         group_id, artifact_id = self._parse_package_name(package_name)
         pom_url = self._build_pom_url(group_id, artifact_id, version, repository_url)
 
-        try:
+        pom_content = self._load_cached_pom(pom_url)
+        cached = pom_content is not None
+        if not cached:
             print(f"Загрузка POM из: {pom_url}")
-            with urllib.request.urlopen(pom_url) as response:
-                pom_content = response.read().decode('utf-8')
-
-            return self._parse_dependencies_from_pom(pom_content)
-
-        except urllib.error.HTTPError as e:
-            if e.code == 404:
+            try:
+                response = self._http.get(pom_url)
+                # Тело дочитывается полностью (оно же сохраняется в кэш), соединение остается пригодным
+                pom_content = response.read()
+            except (OSError, http.client.HTTPException) as e:
+                # Ответ мог остаться недочитанным - соединения потока закрываются
+                self._http.abandon()
+                raise ValueError(f"Ошибка подключения к репозиторию: {e}")
+
+            if response.status == 404:
                 raise ValueError(f"POM файл не найден по URL: {pom_url}")
-            else:
-                raise ValueError(f"Ошибка загрузки POM файла: {e.code} {e.reason}")
-        except urllib.error.URLError as e:
-            raise ValueError(f"Ошибка подключения к репозиторию: {e.reason}")
+            if not 200 <= response.status < 300:
+                raise ValueError(f"Ошибка загрузки POM файла: {response.status} {response.reason}")
+
+        try:
+            # Байты передаются парсеру без decode(): кодировку Expat берет из XML-декларации
+            dependencies = self._parse_dependencies_from_pom(pom_content)
         except Exception as e:
+            # Поврежденный файл удаляется из кэша, при следующем запросе POM будет скачан заново
+            if cached:
+                drop_cached_pom(pom_url)
             raise ValueError(f"Ошибка обработки POM файла: {e}")
 
+        # В кэш попадают только POM-файлы, которые удалось разобрать
+        if not cached:
+            store_cached_pom(pom_url, pom_content)
+        return dependencies
+
+    def _load_cached_pom(self, pom_url: str):
+        #Чтение POM-файла из локального кэша (None - записи нет или она устарела)
+
+        pom_file = open_cached_pom(pom_url)
+        if pom_file is None:
+            return None
+        try:
+            with pom_file:
+                pom_content = pom_file.read()
+        except OSError:
+            return None
+
+        print(f"Загрузка POM из кэша: {pom_file.name}")
+        return pom_content
+
     def _parse_package_name(self, package_name: str) -> tuple[str, str]:
         #Парсинг имени пакета на groupId и artifactId
         parts = package_name.split(':')
@@ -92,72 +187,90 @@ class DependencyGraph:
         repo_url = repository_url.rstrip('/')
         return f"{repo_url}/{group_path}/{artifact_id}/{version}/{artifact_id}-{version}.pom"
 
-    def _parse_dependencies_from_pom(self, pom_content: str) -> List[str]:
+    def _parse_dependencies_from_pom(self, pom_content: bytes) -> List[str]:
         #Парсинг зависимостей из POM-файла.
 
         try:
-            root = ET.fromstring(pom_content)
+            if _lxml_etree is None:
+                root = ET.fromstring(pom_content)
+            else:
+                root = _lxml_etree.fromstring(pom_content, _LXML_PARSER)
 
             # Проверка namespace POM файла
             if not root.tag.startswith('{http://maven.apache.org/POM/'):
                 raise ValueError("Некорректный формат POM файла: отсутствует ожидаемый namespace")
 
-            dependencies_elem = root.find('.//{http://maven.apache.org/POM/4.0.0}dependencies')
-            if dependencies_elem is None:
-                return []
+            if _lxml_etree is not None:
+                dep_elems = _DEPENDENCY_XPATH(root)
+            else:
+                dependencies_elem = root.find(_TAG_DEPS)
+                if dependencies_elem is None:
+                    return []
+                dep_elems = dependencies_elem.findall(_TAG_DEP)
 
             dependencies = []
-            for dep_elem in dependencies_elem.findall('{http://maven.apache.org/POM/4.0.0}dependency'):
-                group_id = dep_elem.find('{http://maven.apache.org/POM/4.0.0}groupId')
-                artifact_id = dep_elem.find('{http://maven.apache.org/POM/4.0.0}artifactId')
-                version_elem = dep_elem.find('{http://maven.apache.org/POM/4.0.0}version')
+            for dep_elem in dep_elems:
+                group_id = dep_elem.find(_TAG_G)
+                artifact_id = dep_elem.find(_TAG_A)
+                version_elem = dep_elem.find(_TAG_V)
 
                 if (group_id is not None and artifact_id is not None and
                         group_id.text and artifact_id.text):
 
-                    # Формируем строку зависимости
-                    dep_name = f"{group_id.text.strip()}:{artifact_id.text.strip()}"
-
-                    # Добавляем версию, если она указана
-                    if version_elem is not None and version_elem.text:
-                        dep_name += f":{version_elem.text.strip()}"
+                    # Формируем строку зависимости одним f-string, версию добавляем если она указана
+                    version = version_elem.text if version_elem is not None else None
+                    if version:
+                        dep_name = f"{group_id.text.strip()}:{artifact_id.text.strip()}:{version.strip()}"
+                    else:
+                        dep_name = f"{group_id.text.strip()}:{artifact_id.text.strip()}"
 
                     dependencies.append(dep_name)
 
-            return dependencies
+            # Повторно объявленные зависимости оставляем один раз (в порядке первого появления)
+            return list(dict.fromkeys(dependencies))
 
-        except ET.ParseError as e:
+        except _XML_ERRORS as e:
             raise ValueError(f"Ошибка парсинга POM файла: {e}")
 
     def read_dependencies_from_test_file(self, package_name: str, test_repo_path: str) -> List[str]:
         #Чтение зависимостей из тестового файла.
 
         try:
-            if not os.path.exists(test_repo_path):
-                raise ValueError(f"Тестовый файл не найден: {test_repo_path}")
+            # Если пакет не найден, возвращаем пустой список
+            return self._load_test_graph(test_repo_path).get(package_name, [])
+
+        except Exception as e:
+            raise ValueError(f"Ошибка чтения тестового файла: {e}")
 
-            with open(test_repo_path, 'r', encoding='utf-8') as f:
-                content = f.read()
+    def _load_test_graph(self, test_repo_path: str) -> Dict[str, List[str]]:
+        #Граф тестового файла: файл разбирается один раз, повторно - только после его изменения.
 
-            # Парсим файл построчно
-            for line in content.split('\n'):
+        if not os.path.exists(test_repo_path):
+            raise ValueError(f"Тестовый файл не найден: {test_repo_path}")
+
+        key = os.path.abspath(test_repo_path)
+        mtime = os.path.getmtime(key)
+        cached = self._test_graph_cache.get(key)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+
+        test_graph: Dict[str, List[str]] = {}
+        # Читаем файл построчно, не загружая целиком
+        with open(test_repo_path, 'r', encoding='utf-8') as f:
+            for line in f:
                 line = line.strip()
                 # Пропускаем пустые строки и комментарии
                 if line and ':' in line and not line.startswith('#'):
                     parts = line.split(':', 1)  # Разделяем только по первому двоеточию
                     pkg = parts[0].strip()
-                    # Если нашли нужный пакет
-                    if pkg == package_name:
+                    # Учитывается первая строка пакета, повторные описания игнорируются
+                    if pkg not in test_graph:
                         deps_str = parts[1].strip()
-                        # Разделяем зависимости по запятым
-                        dependencies = [dep.strip() for dep in deps_str.split(',') if dep.strip()]
-                        return dependencies
-
-            # Если пакет не найден, возвращаем пустой список
-            return []
+                        # Разделяем зависимости по запятым; повторы убираем с сохранением порядка
+                        test_graph[pkg] = list(dict.fromkeys(dep for dep in map(str.strip, deps_str.split(',')) if dep))
 
-        except Exception as e:
-            raise ValueError(f"Ошибка чтения тестового файла: {e}")
+        self._test_graph_cache[key] = (mtime, test_graph)
+        return test_graph
 
     def get_package_dependencies(self, package_name: str, version: str, repository_url: str, is_test_mode: bool) -> \
     List[str]:
@@ -166,140 +279,259 @@ class DependencyGraph:
             # В тестовом режиме читаем из файла
             return self.read_dependencies_from_test_file(package_name, repository_url)
         else:
-            # В реальном режиме загружаем из репозитория
-            return self.get_dependencies_from_pom(package_name, version, repository_url)
+            # В реальном режиме загружаем из репозитория один раз на пакет: общие транзитивные
+            # зависимости (ромбы) и повторные построения графа берут результат из кэша
+            key = (package_name, version, repository_url)
+            dependencies = self._dep_cache.get(key)
+            if dependencies is None:
+                dependencies = self.get_dependencies_from_pom(package_name, version, repository_url)
+                self._dep_cache[key] = dependencies
+            elif isinstance(dependencies, Exception):
+                raise dependencies
+            return dependencies
 
     def _should_filter_package(self, package_name: str, package_filter: str) -> bool:
         #Проверка, нужно ли фильтровать пакет.
 
         if not package_filter:
             return False
-        return package_filter in package_name
+
+        # Фильтр может содержать несколько подстрок через запятую; разбирается один раз на строку фильтра
+        if package_filter != self._filter_source:
+            self._filter_source = package_filter
+            self._filter_tuple = tuple(part.strip() for part in package_filter.split(',') if part.strip())
+
+        return any(part in package_name for part in self._filter_tuple)
 
     def build_dependency_graph(self, package_name: str, version: str, repository_url: str,
                                is_test_mode: bool, package_filter: str = "",
                                depth: int = 0, max_depth: int = 10) -> None:
 
-        #Основноц метод: Рекурсивное построение графа зависимостей с использованием DFS.
+        #Основноц метод: построение графа зависимостей итеративным DFS с поиском циклов алгоритмом Тарьяна.
 
-        #Защита обезвечивания: проверка максимальной глубины рекурсии
-        if depth > max_depth:
-            self.graph[package_name] = ["MAX_DEPTH_REACHED"]
-            return
+        # Граф изменяется: отсортированный список пакетов для вывода нужно построить заново
+        self._sorted_keys = None
 
-        #Фильтрация: проверка нужно ли фильтровать этот пакет
-        if self._should_filter_package(package_name, package_filter):
-            self.graph[package_name] = ["FILTERED"]
-            return
+        # Первый построенный пакет - корень ASCII-дерева при выводе
+        if self._root is None:
+            self._root = package_name
 
-        #Обнаружение циклов: проверка находится ли пакет в текущем пути обхода
-        if package_name in self.visiting:
-            # Найден цикл - вычисляем путь цикла
-            cycle_start_index = self.visiting.index(package_name)
-            cycle_path = self.visiting[cycle_start_index:] + [package_name]
-            cycle_key = " -> ".join(cycle_path)
-
-            # Сохраняем информацию о цикле для всех участвующих пакетов
-            for node in cycle_path:
-                if node not in self.cycles:
-                    self.cycles[node] = set()
-                self.cycles[node].add(cycle_key)
-
-            # Добавляем пакет в граф если его еще нет
-            if package_name not in self.graph:
-                self.graph[package_name] = []
-            return
+        #Реальный режим: сначала параллельно загружаем POM-файлы всех достижимых пакетов,
+        #затем DFS берет зависимости из кэша без ожидания сети
+        if not is_test_mode:
+            self._prefetch_dependencies(package_name, version, repository_url, package_filter, depth, max_depth)
 
-        #Избежание повторного посещения: если пакет уже полностью обработан
-        if package_name in self.visited:
-            return
+        #Явный стек обхода вместо рекурсии: (пакет, глубина, итератор по его зависимостям)
+        stack = []
+        next_package = (package_name, depth)
 
-        #Добавление в текущий путь: помечаем пакет как обрабатываемый
-        self.visiting.append(package_name)
+        while True:
+            if next_package is not None:
+                package, package_depth = next_package
+                next_package = None
+                parent = stack[-1][0] if stack else None
+
+                #Защита обезвечивания: проверка максимальной глубины (пакеты циклов уже обработаны)
+                if package_depth > max_depth:
+                    if package not in self.cycles:
+                        self.graph[package] = ["MAX_DEPTH_REACHED"]
+                    continue
+
+                #Фильтрация: проверка нужно ли фильтровать этот пакет
+                if self._should_filter_package(package, package_filter):
+                    self.graph[package] = ["FILTERED"]
+                    continue
+
+                #Обнаружение циклов: пакет находится в текущем пути обхода (обратное ребро)
+                if package in self.visiting:
+                    # Запоминаем путь цикла, он станет описанием цикла компоненты
+                    cycle_path = [frame[0] for frame in stack[self.visiting[package]:]]
+                    cycle_path.append(package)
+                    self._cycle_paths.setdefault(package, cycle_path)
+
+                    # Добавляем пакет в граф если его еще нет
+                    if package not in self.graph:
+                        self.graph[package] = []
+                    self.lowlink[parent] = min(self.lowlink[parent], self.index[package])
+                    continue
+
+                #Избежание повторного посещения: если пакет уже полностью обработан
+                if package in self.visited:
+                    # Пакет из еще не выделенной компоненты - ребро внутри компоненты
+                    if parent is not None and package in self._on_tarjan_stack:
+                        self.lowlink[parent] = min(self.lowlink[parent], self.index[package])
+                    continue
+
+                #Добавление в текущий путь: помечаем пакет как обрабатываемый
+                self.index[package] = self.lowlink[package] = len(self.index)
+                self._tarjan_stack.append(package)
+                self._on_tarjan_stack.add(package)
+                self.visiting[package] = len(stack)
+
+                try:
+                    #Получение зависимостей: получаем зависимости текущего пакета
+                    dependencies = self.get_package_dependencies(package, version, repository_url, is_test_mode)
+
+                    #Сохранение оригинальных данных: список не копируется - пометка цикла заменяет
+                    #запись графа новым списком, а сами списки зависимостей нигде не изменяются
+                    self.original_dependencies[package] = dependencies
+
+                    #Добавление в граф: добавляем пакет и его зависимости в граф
+                    self.graph[package] = dependencies
+
+                except Exception as e:
+                    #Обработка ошибок: если не удалось получить зависимости
+                    self.graph[package] = [f"ERROR: {str(e)}"]
+                    dependencies = []
+
+                stack.append((package, package_depth, iter(dependencies)))
+                continue
 
-        try:
-            #Получение зависимостей: получаем зависимости текущего пакета
-            dependencies = self.get_package_dependencies(package_name, version, repository_url, is_test_mode)
+            if not stack:
+                break
 
-            #Сохранение оригинальных данных: сохраняем зависимости до обработки циклов
-            self.original_dependencies[package_name] = dependencies.copy()
+            #Обход зависимостей: следующая необработанная зависимость пакета на вершине стека
+            package, package_depth, dependencies_iter = stack[-1]
+            dep = next(dependencies_iter, None)
+            if dep is not None:
+                next_package = (dep, package_depth + 1)
+                continue
 
-            #Добавление в граф: добавляем пакет и его зависимости в граф
-            self.graph[package_name] = dependencies
+            # Завершение обработки: удаляем из текущего пути и добавляем в посещенные
+            stack.pop()
+            del self.visiting[package]
+            self.visited.add(package)
 
-            # Рекурсивный обход: обрабатываем каждую зависимость
-            for dep in dependencies:
-                dep_version = None if is_test_mode else version
-                self.build_dependency_graph(dep, dep_version, repository_url, is_test_mode,
-                                            package_filter, depth + 1, max_depth)
+            # Пакет - корень компоненты сильной связности: выделяем ее
+            if self.lowlink[package] == self.index[package]:
+                self._pop_component(package)
 
-        except Exception as e:
-            #Обработка ошибок: если не удалось получить зависимости
-            self.graph[package_name] = [f"ERROR: {str(e)}"]
+            if stack:
+                parent = stack[-1][0]
+                self.lowlink[parent] = min(self.lowlink[parent], self.lowlink[package])
+
+    def _prefetch_dependencies(self, package_name: str, version: str, repository_url: str,
+                               package_filter: str, depth: int, max_depth: int) -> None:
+        #Предварительная загрузка зависимостей обходом в ширину: POM-файлы одного уровня
+        #загружаются одновременно, время уровня - самый долгий запрос, а не сумма запросов.
+
+        seen = {package_name}
+        frontier = [package_name]
 
+        try:
+            with ThreadPoolExecutor(max_workers=_FETCH_WORKERS) as executor:
+                while frontier and depth <= max_depth:
+                    futures = {}
+                    for package in frontier:
+                        if self._should_filter_package(package, package_filter):
+                            continue
+                        key = (package, version, repository_url)
+                        if key not in self._dep_cache:
+                            futures[executor.submit(self.get_dependencies_from_pom, package, version,
+                                                    repository_url)] = key
+
+                    # Ошибка загрузки запоминается: основной обход выведет ее без повторного запроса
+                    for future in as_completed(futures):
+                        try:
+                            self._dep_cache[futures[future]] = future.result()
+                        except Exception as e:
+                            self._dep_cache[futures[future]] = e
+
+                    # Следующий уровень: еще не встречавшиеся зависимости пакетов текущего уровня
+                    next_frontier = []
+                    for package in frontier:
+                        dependencies = self._dep_cache.get((package, version, repository_url), ())
+                        if isinstance(dependencies, Exception):
+                            continue
+                        for dep in dependencies:
+                            if dep not in seen:
+                                seen.add(dep)
+                                next_frontier.append(dep)
+
+                    frontier = next_frontier
+                    depth += 1
         finally:
-            # Завершение обработки: удаляем из текущего пути и добавляем в посещенные
-            self.visiting.remove(package_name)
-            self.visited.add(package_name)
+            # Потоки пула завершены: их постоянные соединения больше не понадобятся
+            self._http.close_worker_connections()
 
-    def _process_cycles(self) -> None:
-        #Обработка циклических зависимостей для специального отображения.
+    def _pop_component(self, root: str) -> None:
+        #Выделение компоненты сильной связности и пометка цикла для отображения.
 
-        processed_cycles = set()
+        component = []
+        while True:
+            node = self._tarjan_stack.pop()
+            self._on_tarjan_stack.discard(node)
+            component.append(node)
+            if node == root:
+                break
 
-        for node, cycle_set in self.cycles.items():
-            if node in self.graph and cycle_set:
-                # Формируем описание цикла
-                cycle_desc = f"CYCLE: {list(cycle_set)[0]}"
-                cycle_nodes = list(cycle_set)[0].split(" -> ")
+        # Описание цикла: первый найденный путь цикла (в порядке обнаружения пакетов компоненты)
+        cycle_path = None
+        for node in reversed(component):
+            path = self._cycle_paths.pop(node, None)
+            if cycle_path is None:
+                cycle_path = path
 
-                # Находим узел с минимальным алфавитным порядком в цикле
-                # Этот узел будет отображать информацию о цикле
-                first_cycle_node = min(cycle_nodes) if cycle_nodes else node
+        # Одиночный пакет без зависимости от самого себя - не цикл
+        if cycle_path is None:
+            return
 
-                # Если это первый узел цикла, заменяем его зависимости на описание цикла
-                if node == first_cycle_node:
-                    self.graph[node] = [cycle_desc]
-                else:
-                    # Для остальных узлов в цикле восстанавливаем оригинальные зависимости
-                    if node in self.original_dependencies:
-                        self.graph[node] = self.original_dependencies[node]
+        cycle_desc = f"CYCLE: {' -> '.join(cycle_path)}"
+        # Узел с минимальным алфавитным порядком в цикле отображает информацию о цикле,
+        # остальные пакеты компоненты сохраняют оригинальные зависимости
+        first_cycle_node = min(cycle_path)
+        for node in component:
+            self.cycles[node] = {cycle_desc}
+            if node == first_cycle_node:
+                self.graph[node] = [cycle_desc]
+            elif node in self.original_dependencies:
+                self.graph[node] = self.original_dependencies[node]
 
     def display_ascii_tree(self, start_package: str, prefix: str = "", is_last: bool = True) -> None:
         #Отображение графа в виде ASCII-дерева.
 
-        # Определяем соединители для дерева
-        connectors = "└── " if is_last else "├── "
-        print(prefix + connectors + start_package)
+        # Все дерево выводится одной записью вместо print() на каждую строку
+        sys.stdout.write("".join(self._ascii_tree_lines(start_package, prefix, is_last)))
+
+    def _ascii_tree_lines(self, start_package: str, prefix: str, is_last: bool) -> List[str]:
+        #Строки ASCII-дерева (с переводом строки) для вывода одной записью.
+
+        #Явный стек вместо рекурсии: (пакет, префикс, последний ли элемент, корень ли обхода).
+        #Дети кладутся в обратном порядке, поэтому строки идут в том же порядке, что при рекурсии
+        lines = []
+        stack = [(start_package, prefix, is_last, True)]
+
+        while stack:
+            package, package_prefix, is_last_package, is_root = stack.pop()
+
+            # Определяем соединители для дерева
+            connector = "└── " if is_last_package else "├── "
+            lines.append(f"{package_prefix}{connector}{package}\n")
 
-        if start_package in self.graph:
-            dependencies = self.graph[start_package]
+            # Обработка специальных случаев (циклы, ошибки, фильтры) и листовых/уже обработанных узлов:
+            # проверка visited выполняется в момент вывода, как при рекурсивном обходе
+            if not is_root:
+                if package.startswith(_MARKER_PREFIXES) or package not in self.graph or package in self.visited:
+                    continue
+                self.visited.add(package)
+            elif package not in self.graph:
+                continue
+
+            dependencies = self.graph[package]
             # Вычисляем новый префикс для следующего уровня
-            new_prefix = prefix + ("    " if is_last else "│   ")
-
-            for i, dep in enumerate(dependencies):
-                is_last_dep = (i == len(dependencies) - 1)
-
-                # Обработка специальных случаев (циклы, ошибки, фильтры)
-                if dep.startswith("CYCLE:") or dep.startswith("ERROR:") or dep.startswith("FILTERED"):
-                    connector = "└── " if is_last_dep else "├── "
-                    print(new_prefix + connector + dep)
-                else:
-                    # Рекурсивный вызов для обычных зависимостей
-                    if dep in self.graph and dep not in self.visited:
-                        self.visited.add(dep)
-                        self.display_ascii_tree(dep, new_prefix, is_last_dep)
-                    else:
-                        # Листовой узел или уже обработанный узел
-                        connector = "└── " if is_last_dep else "├── "
-                        print(new_prefix + connector + dep)
+            new_prefix = package_prefix + ("    " if is_last_package else "│   ")
+            last_index = len(dependencies) - 1
+            for i in range(last_index, -1, -1):
+                stack.append((dependencies[i], new_prefix, i == last_index, False))
+
+        return lines
 
     def display_dependency_graph(self, ascii_mode: bool = False) -> None:
         #Вывод графа зависимостей в выбранном формате.
 
-        print("\n" + "-" * 60)
-        print("ГРАФ ЗАВИСИМОСТЕЙ")
-        print("-" * 60)
+        # Заголовок, граф и статистика собираются в список и выводятся одной записью
+        separator = "-" * 60
+        out = [f"\n{separator}\nГРАФ ЗАВИСИМОСТЕЙ\n{separator}\n"]
 
         if ascii_mode:
             # Сохраняем и временно очищаем visited для ASCII отображения
@@ -307,31 +539,27 @@ class DependencyGraph:
             self.visited.clear()
 
             # Определяем стартовый пакет для отображения
-            start_package = next(iter(self.original_dependencies.keys())) if self.original_dependencies else next(
-                iter(self.graph.keys()))
-            self.display_ascii_tree(start_package)
+            start_package = self._root or next(iter(self.graph))
+            out.extend(self._ascii_tree_lines(start_package, "", True))
 
             # Восстанавливаем visited
             self.visited = ascii_visited
         else:
-            # Стандартный вывод в формате "пакет -> [зависимости]"
-            sorted_packages = sorted(self.graph.keys())
-            for package in sorted_packages:
-                dependencies = self.graph[package]
-
-                # Специальная обработка для циклических зависимостей
-                if dependencies and len(dependencies) == 1 and dependencies[0].startswith("CYCLE:"):
-                    print(f"{package} -> [{dependencies[0]}]")
-                elif dependencies:
-                    deps_str = ", ".join(dependencies)
-                    print(f"{package} -> [{deps_str}]")
-                else:
-                    print(f"{package} -> []")
+            # Стандартный вывод в формате "пакет -> [зависимости]"; порядок пакетов сортируется
+            # один раз после построения графа и переиспользуется при повторных выводах
+            if self._sorted_keys is None:
+                self._sorted_keys = sorted(self.graph)
+
+            # Пометка цикла - единственный элемент списка, поэтому join выводит ее как "пакет -> [CYCLE: ...]"
+            graph = self.graph
+            out.extend(f"{package} -> [{', '.join(graph[package])}]\n" for package in self._sorted_keys)
 
         # Статистика графа
-        print(f"\nВсего пакетов в графе: {len(self.graph)}")
+        out.append(f"\nВсего пакетов в графе: {len(self.graph)}\n")
         if self.cycles:
-            print(f"Обнаружено циклических зависимостей: {len(self.cycles)}")
+            out.append(f"Обнаружено циклических зависимостей: {len(self.cycles)}\n")
+
+        sys.stdout.write("".join(out))
 
     def create_test_files(self) -> None:
         #Создание тестовых файлов для демонстрации
@@ -381,22 +609,8 @@ L:"""  # Сложная структура с множественными пу
         #Получает список всех пакетов из тестового файла.
 
         try:
-            if not os.path.exists(test_repo_path):
-                raise ValueError(f"Тестовый файл не найден: {test_repo_path}")
-
-            with open(test_repo_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-
-            packages = []
-            for line in content.split('\n'):
-                line = line.strip()
-                # Извлекаем имена пакетов из каждой строки
-                if line and ':' in line and not line.startswith('#'):
-                    pkg = line.split(':', 1)[0].strip()
-                    if pkg and pkg not in packages:
-                        packages.append(pkg)
-
-            return packages
+            # Пакеты в порядке первого упоминания - ключи разобранного графа тестового файла
+            return [pkg for pkg in self._load_test_graph(test_repo_path) if pkg]
 
         except Exception as e:
             raise ValueError(f"Ошибка чтения тестового файла: {e}")
@@ -421,9 +635,6 @@ L:"""  # Сложная структура с множественными пу
             if package not in self.visited:
                 self.build_dependency_graph(package, None, repository_url, is_test_mode)
 
-        # Обрабатываем циклические зависимости
-        self._process_cycles()
-
         print(f"Обработано пакетов: {len(self.visited)}/{total_packages}")
         print("Полный граф построен!")
 
@@ -474,6 +685,13 @@ L:"""  # Сложная структура с множественными пу
         self.visiting.clear()
         self.cycles.clear()
         self.original_dependencies.clear()
+        self.index.clear()
+        self.lowlink.clear()
+        self._tarjan_stack.clear()
+        self._on_tarjan_stack.clear()
+        self._cycle_paths.clear()
+        self._sorted_keys = None
+        self._root = None
 
         # Строим полный граф в тестовом режиме
         self.build_complete_dependency_graph(file_path, True)
@@ -514,8 +732,6 @@ def main():
                     is_test_mode=False,
                     package_filter=config['package_filter']
                 )
-                # Обрабатываем циклические зависимости
-                graph._process_cycles()
 
             # Вывод результатов в выбранном формате
             graph.display_dependency_graph(config['ascii_tree_mode'])
@@ -1,23 +1,152 @@
 import configparser
+import functools
+import http.client
+import io
+import logging
 import os
 import sys
-import urllib.request
-import urllib.error
 import xml.etree.ElementTree as ET
-from typing import Dict, List, Set, Any
-from collections import deque, defaultdict
+from typing import Dict, List, Optional, Set, Any, Tuple, Union
+from array import array
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+# HTTP-клиент и кэш POM-файлов общие для этапов 2-4 (постоянные соединения, прокси, повторы при сетевых ошибках)
+from repo_core import HttpClient, caching_reader, drop_cached_pom, open_cached_pom
+
+try:
+    # lxml разбирает XML средствами libxml2 (быстрее); без него используется xml.etree.ElementTree
+    from lxml import etree as _lxml_etree
+except ImportError:
+    _lxml_etree = None
+
+if _lxml_etree is not None:
+    # Внешние сущности не подставляются и не загружаются по сети (защита от XXE, до lxml 5 подстановка
+    # включена по умолчанию); xml.etree.ElementTree внешние сущности не загружает
+    _iterparse = functools.partial(_lxml_etree.iterparse, resolve_entities=False, no_network=True)
+    _XML_ERRORS = (ET.ParseError, _lxml_etree.XMLSyntaxError)
+else:
+    _iterparse = ET.iterparse
+    _XML_ERRORS = (ET.ParseError,)
+
+# Диагностика загрузки (по одной строке на POM) выводится через логгер и включается флагом --verbose
+log = logging.getLogger("depgraph")
+
+class _Marker(str):
+    # Служебная запись графа (цикл, ошибка, фильтр, предел глубины): отличается от имени пакета типом,
+    # поэтому проверка - один isinstance вместо сравнения префиксов строки
+    __slots__ = ()
+
+
+_FILTERED = _Marker("FILTERED")
+_MAX_DEPTH = _Marker("MAX_DEPTH_REACHED")
+# Версия зависимости задана свойством ${...} (обычно из родительского POM или BOM): POM по ней не загрузить
+_UNRESOLVED = _Marker("UNRESOLVED")
+
+# Логические параметры конфигурации (по умолчанию выключены) и значения, трактуемые как "включено"
+_BOOL_PARAMS = ('test_repository_mode', 'ascii_tree_mode', 'load_order_mode', 'demo_mode')
+_TRUE_VALUES = frozenset({'true', 'yes', '1', 'on'})
+
+# Число параллельных загрузок POM-файлов
+_FETCH_WORKERS = 16
+
+# Полные имена тегов POM-файла (строятся один раз при импорте)
+_POM_NS = 'http://maven.apache.org/POM/4.0.0'
+_NS = f'{{{_POM_NS}}}'
+# Корневой элемент проверяется по общему префиксу namespace POM (допускаются версии модели 4.x)
+_POM_NS_PREFIX = '{http://maven.apache.org/POM/'
+_POM_NS_PREFIX_LEN = len(_POM_NS_PREFIX)
+_TAG_DEPS = _NS + 'dependencies'
+_TAG_DEP = _NS + 'dependency'
+_TAG_G = _NS + 'groupId'
+_TAG_A = _NS + 'artifactId'
+_TAG_V = _NS + 'version'
+
+# Постоянный текст пояснений к порядку загрузки: собирается один раз и выводится одним вызовом print
+_LOAD_ORDER_NOTES = "\n".join([
+    "\nОБЪЯСНЕНИЕ ПОРЯДКА:",
+    "-" * 40,
+    "Порядок основан на топологической сортировке графа зависимостей.",
+    "Каждый пакет загружается после всех своих зависимостей.",
+    "Это гарантирует, что при загрузке пакета все его зависимости уже доступны.",
+    "\nСРАВНЕНИЕ С РЕАЛЬНЫМИ МЕНЕДЖЕРАМИ ПАКЕТОВ:",
+    "-" * 40,
+    "В реальных менеджерах пакетов могут быть расхождения из-за:",
+    "1. Учета версий зависимостей",
+    "2. Разрешения конфликтов версий",
+    "3. Оптимизации для параллельной загрузки",
+    "4. Учета дополнительных метаданных пакетов",
+    "5. Поддержки альтернативных зависимостей",
+    "6. Кэширования уже загруженных пакетов",
+    "\nВЕРОЯТНЫЕ РАСХОЖДЕНИЯ:",
+    "-" * 40,
+    "Cargo (Rust): Может объединять одинаковые версии зависимостей",
+    "npm (Node.js): Использует плоскую структуру node_modules",
+    "pip (Python): Учитывает совместимость версий Python",
+    "Maven (Java): Учитывает scope зависимостей (compile/test/runtime)",
+])
 
 
 class DependencyGraph:
     def __init__(self):
         self.graph: Dict[str, List[str]] = {}
         self.visited: Set[str] = set()
-        self.visiting: List[str] = []
-        self.cycles: Dict[str, Set[str]] = {}
-        self.original_dependencies: Dict[str, List[str]] = {}
+        self.visiting: Dict[str, int] = {}  # Текущий путь обхода: пакет -> позиция в стеке обхода
+        self.cycles: Dict[str, Tuple[str, ...]] = {}
+        self.original_dependencies: Dict[str, List[str]] = {}  # Зависимости пакетов циклов, замененные при обходе
+        self._root: Optional[str] = None  # Пакет, с которого начато первое построение графа
+
+        # Состояние алгоритма Тарьяна (поиск компонент сильной связности)
+        self.index: Dict[str, int] = {}
+        self.lowlink: Dict[str, int] = {}
+        self._tarjan_stack: List[str] = []
+        self._on_tarjan_stack: Set[str] = set()
+        self._cycle_paths: Dict[str, List[str]] = {}
+        # Пакеты в порядке завершения обхода: зависимости завершаются раньше зависящих от них пакетов
+        self._finish_order: List[str] = []
+        # Обход обрывался на пакете (предел глубины, фильтр, свойство ${...}): такой пакет может быть
+        # раскрыт позже другим корнем, и порядок завершения уже не будет порядком загрузки
+        self._truncated = False
+
+        # HTTP-клиент с постоянными соединениями потоков (общий для этапов 2-4)
+        self._http = HttpClient()
+
+        # Полученные зависимости: (пакет, версия, репозиторий или тестовый файл) -> зависимости
+        # или ошибка предварительной загрузки (повторно не загружается, выводится при обходе)
+        self._dep_cache: Dict[Tuple[str, str, str], Union[List[str], Exception]] = {}
+
+        # Разобранные тестовые файлы: путь -> (пакет -> зависимости)
+        self._test_adj: Dict[str, Dict[str, List[str]]] = {}
+
+        # Граф для порядка загрузки в целочисленном виде (None - граф изменился): пакеты графа
+        # пронумерованы по порядку, обратные ребра хранятся в массивах CSR (смещения + номера пакетов)
+        self._names: List[str] = []
+        self._rev_offsets: Optional[array] = None
+        self._rev_edges: array = array('i')
+        self._in_degree: array = array('i')
+
+    def _reset(self) -> None:
+        # Сброс состояния перед анализом нового графа: граф, состояние обхода и все производные кэши.
+        # HTTP-соединения и кэш POM-файлов не зависят от графа и сохраняются
+        self.graph.clear()
+        self.visited.clear()
+        self.visiting.clear()
+        self.cycles.clear()
+        self.original_dependencies.clear()
+        self.index.clear()
+        self.lowlink.clear()
+        self._tarjan_stack.clear()
+        self._on_tarjan_stack.clear()
+        self._cycle_paths.clear()
+        self._finish_order.clear()
+        self._truncated = False
+        self._dep_cache.clear()
+        self._test_adj.clear()
+        self._rev_offsets = None
+        self._root = None
 
     def parse_config(self, config_path: str = "config.ini") -> Dict[str, Any]:
-        config_parser = configparser.ConfigParser()
+        # Без интерполяции: get() сводится к поиску в словаре, без regex-подстановок %(...)s
+        config_parser = configparser.RawConfigParser(interpolation=None)
 
         if not os.path.exists(config_path):
             raise ValueError(f"Конфигурационный файл не найден: {config_path}")
@@ -31,24 +160,17 @@ class DependencyGraph:
             raise ValueError("В конфигурационном файле отсутствует секция 'package'")
 
         package_section = config_parser['package']
-        config = {}
 
-        required_params = ['name', 'version', 'repository_url']
+        required_params = ('name', 'version', 'repository_url')
+        config = {param: package_section.get(param, '').strip() for param in required_params}
         for param in required_params:
-            if param not in package_section or not package_section[param].strip():
+            if not config[param]:
                 raise ValueError(f"Обязательный параметр '{param}' отсутствует или пуст")
-            config[param] = package_section[param].strip()
 
-        config['test_repository_mode'] = package_section.get('test_repository_mode', 'false').lower() in ('true', 'yes',
-                                                                                                          '1', 'on')
         config['test_repository_path'] = package_section.get('test_repository_path', './test_repo')
         config['package_filter'] = package_section.get('package_filter', '')
-        config['ascii_tree_mode'] = package_section.get('ascii_tree_mode', 'false').lower() in ('true', 'yes', '1',
-                                                                                                'on')
         config['output_filename'] = package_section.get('output_filename', 'dependency_graph.png')
-        config['load_order_mode'] = package_section.get('load_order_mode', 'false').lower() in ('true', 'yes', '1',
-                                                                                                'on')
-        config['demo_mode'] = package_section.get('demo_mode', 'false').lower() in ('true', 'yes', '1', 'on')
+        config.update({param: package_section.get(param, 'false').lower() in _TRUE_VALUES for param in _BOOL_PARAMS})
 
         return config
 
@@ -56,23 +178,57 @@ class DependencyGraph:
         group_id, artifact_id = self._parse_package_name(package_name)
         pom_url = self._build_pom_url(group_id, artifact_id, version, repository_url)
 
+        # Опубликованные (не SNAPSHOT) POM-файлы берутся из общего с этапами 2-3 кэша исходных файлов.
+        # Зависимости разбираются заново при каждом запуске, поэтому изменения разбора сразу действуют
+        pom_file = open_cached_pom(pom_url)
+        if pom_file is not None:
+            log.debug("Загрузка POM из кэша: %s", pom_file.name)
+            try:
+                with pom_file:
+                    return self._parse_dependencies_from_pom(pom_file)
+            except Exception as e:
+                # Поврежденный файл удаляется из кэша, при следующем запросе POM будет скачан заново
+                drop_cached_pom(pom_url)
+                raise ValueError(f"Ошибка обработки POM файла: {e}")
+
+        log.debug("Загрузка POM из: %s", pom_url)
         try:
-            print(f"Загрузка POM из: {pom_url}")
-            with urllib.request.urlopen(pom_url) as response:
-                pom_content = response.read().decode('utf-8')
-
-            return self._parse_dependencies_from_pom(pom_content)
-
-        except urllib.error.HTTPError as e:
-            if e.code == 404:
-                raise ValueError(f"POM файл не найден по URL: {pom_url}")
-            else:
-                raise ValueError(f"Ошибка загрузки POM файла: {e.code} {e.reason}")
-        except urllib.error.URLError as e:
-            raise ValueError(f"Ошибка подключения к репозиторию: {e.reason}")
+            response = self._http.get(pom_url)
+            if not 200 <= response.status < 300:
+                # Тело ответа с ошибкой дочитывается, чтобы соединение можно было использовать повторно
+                self._http.discard(response)
+        except (OSError, http.client.HTTPException) as e:
+            raise ValueError(f"Ошибка подключения к репозиторию: {e}")
+
+        if response.status == 404:
+            raise ValueError(f"POM файл не найден по URL: {pom_url}")
+        if not 200 <= response.status < 300:
+            raise ValueError(f"Ошибка загрузки POM файла: {response.status} {response.reason}")
+
+        # Ответ параллельно с разбором сохраняется во временный файл кэша
+        stream = caching_reader(response, pom_url) or response
+        try:
+            # Ответ передается парсеру как поток байтов: без копии всего POM в памяти и без decode(),
+            # кодировку парсер берет из XML-декларации. Остаток тела дочитывается (в кэш попадает весь файл)
+            dependencies = self._parse_dependencies_from_pom(stream)
+            stream.read()
+        except (OSError, http.client.HTTPException) as e:
+            if stream is not response:
+                stream.finish(False)
+            self._http.abandon()
+            raise ValueError(f"Ошибка подключения к репозиторию: {e}")
         except Exception as e:
+            if stream is not response:
+                stream.finish(False)
+            # Тело ответа прочитано не до конца - соединения потока закрываются
+            self._http.abandon()
             raise ValueError(f"Ошибка обработки POM файла: {e}")
 
+        # Атомарно помещаем полностью скачанный и разобранный файл в кэш
+        if stream is not response:
+            stream.finish(True)
+        return dependencies
+
     def _parse_package_name(self, package_name: str) -> tuple[str, str]:
         parts = package_name.split(':')
         if len(parts) != 2:
@@ -84,67 +240,108 @@ class DependencyGraph:
         repo_url = repository_url.rstrip('/')
         return f"{repo_url}/{group_path}/{artifact_id}/{version}/{artifact_id}-{version}.pom"
 
-    def _parse_dependencies_from_pom(self, pom_content: str) -> List[str]:
+    def _parse_dependencies_from_pom(self, pom_file: io.BufferedIOBase) -> List[str]:
+        # Потоковый разбор: дерево документа не строится целиком, разобранные элементы сразу очищаются.
+        # Учитываются прямые потомки dependency первой секции dependencies (как root.find(...).findall(...))
         try:
-            root = ET.fromstring(pom_content)
-
-            if not root.tag.startswith('{http://maven.apache.org/POM/'):
-                raise ValueError("Некорректный формат POM файла: отсутствует ожидаемый namespace")
-
-            dependencies_elem = root.find('.//{http://maven.apache.org/POM/4.0.0}dependencies')
-            if dependencies_elem is None:
-                return []
-
             dependencies = []
-            for dep_elem in dependencies_elem.findall('{http://maven.apache.org/POM/4.0.0}dependency'):
-                group_id = dep_elem.find('{http://maven.apache.org/POM/4.0.0}groupId')
-                artifact_id = dep_elem.find('{http://maven.apache.org/POM/4.0.0}artifactId')
-                version_elem = dep_elem.find('{http://maven.apache.org/POM/4.0.0}version')
-
-                if (group_id is not None and artifact_id is not None and
-                        group_id.text and artifact_id.text):
-
-                    dep_name = f"{group_id.text.strip()}:{artifact_id.text.strip()}"
-
-                    if version_elem is not None and version_elem.text:
-                        dep_name += f":{version_elem.text.strip()}"
-
-                    dependencies.append(dep_name)
+            path = []
+            dependencies_elem = None
+
+            for event, elem in _iterparse(pom_file, events=('start', 'end')):
+                if event == 'start':
+                    if not path and elem.tag[:_POM_NS_PREFIX_LEN] != _POM_NS_PREFIX:
+                        raise ValueError("Некорректный формат POM файла: отсутствует ожидаемый namespace")
+                    if dependencies_elem is None and path and elem.tag == _TAG_DEPS:
+                        dependencies_elem = elem
+                    path.append(elem)
+                    continue
+
+                path.pop()
+                if not path:
+                    continue
+                parent = path[-1]
+
+                if parent is dependencies_elem and elem.tag == _TAG_DEP:
+                    group_id = elem.find(_TAG_G)
+                    artifact_id = elem.find(_TAG_A)
+                    version_elem = elem.find(_TAG_V)
+
+                    if (group_id is not None and artifact_id is not None and
+                            group_id.text and artifact_id.text):
+
+                        version = version_elem.text if version_elem is not None else None
+                        if version:
+                            dep_name = f"{group_id.text.strip()}:{artifact_id.text.strip()}:{version.strip()}"
+                        else:
+                            dep_name = f"{group_id.text.strip()}:{artifact_id.text.strip()}"
+
+                        dependencies.append(dep_name)
+
+                elif len(path) > 1 and path[-2] is dependencies_elem and parent.tag == _TAG_DEP:
+                    # Поля еще не обработанной зависимости нужны до ее закрывающего тега
+                    continue
+
+                # Обработанный элемент больше не нужен: очищаем и удаляем из родителя
+                elem.clear()
+                parent.remove(elem)
 
             return dependencies
 
-        except ET.ParseError as e:
+        except _XML_ERRORS as e:
             raise ValueError(f"Ошибка парсинга POM файла: {e}")
 
     def read_dependencies_from_test_file(self, package_name: str, test_repo_path: str) -> List[str]:
         try:
-            if not os.path.exists(test_repo_path):
-                raise ValueError(f"Тестовый файл не найден: {test_repo_path}")
+            return self._load_test_repo(test_repo_path).get(package_name, [])
 
-            with open(test_repo_path, 'r', encoding='utf-8') as f:
-                content = f.read()
+        except Exception as e:
+            raise ValueError(f"Ошибка чтения тестового файла: {e}")
 
-            for line in content.split('\n'):
-                line = line.strip()
-                if line and ':' in line and not line.startswith('#'):
-                    parts = line.split(':', 1)
-                    pkg = parts[0].strip()
-                    if pkg == package_name:
-                        deps_str = parts[1].strip()
-                        dependencies = [dep.strip() for dep in deps_str.split(',') if dep.strip()]
-                        return dependencies
+    def _load_test_repo(self, test_repo_path: str) -> Dict[str, List[str]]:
+        # Тестовый файл разбирается один раз в словарь пакет -> зависимости (учитывается первая строка пакета)
+        test_adj = self._test_adj.get(test_repo_path)
+        if test_adj is not None:
+            return test_adj
 
-            return []
+        if not os.path.exists(test_repo_path):
+            raise ValueError(f"Тестовый файл не найден: {test_repo_path}")
 
-        except Exception as e:
-            raise ValueError(f"Ошибка чтения тестового файла: {e}")
+        with open(test_repo_path, 'r', encoding='utf-8') as f:
+            content = f.read()
+
+        # Методы str связаны с локальными именами: в цикле по строкам нет поиска атрибутов
+        strip = str.strip
+        startswith = str.startswith
+        split = str.split
+
+        test_adj = {}
+        for line in content.splitlines():
+            line = strip(line)
+            if line and ':' in line and not startswith(line, '#'):
+                pkg, deps_str = split(line, ':', 1)
+                pkg = strip(pkg)
+                if pkg not in test_adj:
+                    test_adj[pkg] = [dep for dep in map(strip, split(deps_str, ',')) if dep]
+
+        self._test_adj[test_repo_path] = test_adj
+        return test_adj
 
     def get_package_dependencies(self, package_name: str, version: str, repository_url: str, is_test_mode: bool) -> \
             List[str]:
-        if is_test_mode:
-            return self.read_dependencies_from_test_file(package_name, repository_url)
-        else:
-            return self.get_dependencies_from_pom(package_name, version, repository_url)
+        # Зависимости каждого пакета получаются один раз: повторные обращения (ромбы, несколько
+        # корней, предварительная загрузка) не читают файл и не загружают POM заново
+        key = (package_name, version, repository_url)
+        dependencies = self._dep_cache.get(key)
+        if dependencies is None:
+            if is_test_mode:
+                dependencies = self.read_dependencies_from_test_file(package_name, repository_url)
+            else:
+                dependencies = self.get_dependencies_from_pom(package_name, version, repository_url)
+            self._dep_cache[key] = dependencies
+        elif isinstance(dependencies, Exception):
+            raise dependencies
+        return dependencies
 
     def _should_filter_package(self, package_name: str, package_filter: str) -> bool:
         if not package_filter:
@@ -155,67 +352,173 @@ class DependencyGraph:
                                is_test_mode: bool, package_filter: str = "",
                                depth: int = 0, max_depth: int = 10) -> None:
 
-        if depth > max_depth:
-            self.graph[package_name] = ["MAX_DEPTH_REACHED"]
-            return
+        # Итеративный DFS с явным стеком (пакет, глубина, итератор по зависимостям);
+        # циклы выделяются по ходу обхода алгоритмом Тарьяна
+        dep_version = None if is_test_mode else version
+        self._rev_offsets = None
+        if self._root is None:
+            self._root = package_name
 
-        if self._should_filter_package(package_name, package_filter):
-            self.graph[package_name] = ["FILTERED"]
-            return
+        # В реальном режиме POM-файлы достижимых пакетов сначала загружаются параллельно по уровням
+        if not is_test_mode:
+            self._prefetch_dependencies(package_name, version, repository_url, package_filter, depth, max_depth)
+        stack = []
+        next_package = (package_name, version, depth)
 
-        if package_name in self.visiting:
-            cycle_start_index = self.visiting.index(package_name)
-            cycle_path = self.visiting[cycle_start_index:] + [package_name]
-            cycle_key = " -> ".join(cycle_path)
+        while True:
+            if next_package is not None:
+                package, package_version, package_depth = next_package
+                next_package = None
+                parent = stack[-1][0] if stack else None
+
+                if package_depth > max_depth:
+                    if package not in self.cycles:
+                        # Зависимости пакета еще не выделенной компоненты могут понадобиться при
+                        # пометке цикла: сохраняем список (без копирования) только в этом случае
+                        if package in self._on_tarjan_stack and package not in self.original_dependencies:
+                            self.original_dependencies[package] = self.graph[package]
+                        self.graph[package] = [_MAX_DEPTH]
+                        self._truncated = True
+                    continue
+
+                if self._should_filter_package(package, package_filter):
+                    self.graph[package] = [_FILTERED]
+                    self._truncated = True
+                    continue
+
+                if '${' in package:
+                    self.graph[package] = [_UNRESOLVED]
+                    self._truncated = True
+                    continue
+
+                if package in self.visiting:
+                    # Обратное ребро: путь цикла станет описанием цикла компоненты
+                    cycle_path = [frame[0] for frame in stack[self.visiting[package]:]]
+                    cycle_path.append(package)
+                    self._cycle_paths.setdefault(package, cycle_path)
+
+                    if package not in self.graph:
+                        self.graph[package] = []
+                    self.lowlink[parent] = min(self.lowlink[parent], self.index[package])
+                    continue
+
+                if package in self.visited:
+                    if parent is not None and package in self._on_tarjan_stack:
+                        self.lowlink[parent] = min(self.lowlink[parent], self.index[package])
+                    continue
+
+                self.index[package] = self.lowlink[package] = len(self.index)
+                self._tarjan_stack.append(package)
+                self._on_tarjan_stack.add(package)
+                self.visiting[package] = len(stack)
 
-            for node in cycle_path:
-                if node not in self.cycles:
-                    self.cycles[node] = set()
-                self.cycles[node].add(cycle_key)
+                try:
+                    dependencies = self.get_package_dependencies(package, package_version, repository_url,
+                                                                 is_test_mode)
 
-            if package_name not in self.graph:
-                self.graph[package_name] = []
-            return
+                    self.graph[package] = dependencies
 
-        if package_name in self.visited:
-            return
+                except Exception as e:
+                    self.graph[package] = [_Marker(f"ERROR: {str(e)}")]
+                    dependencies = []
 
-        self.visiting.append(package_name)
+                stack.append((package, package_depth, iter(dependencies)))
+                continue
 
-        try:
-            dependencies = self.get_package_dependencies(package_name, version, repository_url, is_test_mode)
+            if not stack:
+                break
 
-            self.original_dependencies[package_name] = dependencies.copy()
+            package, package_depth, dependencies_iter = stack[-1]
+            dep = next(dependencies_iter, None)
+            if dep is not None:
+                next_package = (dep, dep_version, package_depth + 1)
+                continue
 
-            self.graph[package_name] = dependencies
+            stack.pop()
+            del self.visiting[package]
+            self.visited.add(package)
+            self._finish_order.append(package)
 
-            for dep in dependencies:
-                dep_version = None if is_test_mode else version
-                self.build_dependency_graph(dep, dep_version, repository_url, is_test_mode,
-                                            package_filter, depth + 1, max_depth)
+            if self.lowlink[package] == self.index[package]:
+                self._pop_component(package)
 
-        except Exception as e:
-            self.graph[package_name] = [f"ERROR: {str(e)}"]
+            if stack:
+                parent = stack[-1][0]
+                self.lowlink[parent] = min(self.lowlink[parent], self.lowlink[package])
+
+    def _prefetch_dependencies(self, package_name: str, version: str, repository_url: str,
+                               package_filter: str, depth: int, max_depth: int) -> None:
+        # Обход в ширину: все пакеты очередного уровня загружаются одновременно, время уровня -
+        # самый долгий запрос, а не сумма запросов. Граф изменяется только в основном потоке при обходе
+        seen = {package_name}
+        frontier = [package_name]
 
+        try:
+            with ThreadPoolExecutor(max_workers=_FETCH_WORKERS) as executor:
+                while frontier and depth <= max_depth:
+                    futures = {}
+                    for package in frontier:
+                        key = (package, version, repository_url)
+                        if (key not in self._dep_cache and '${' not in package and
+                                not self._should_filter_package(package, package_filter)):
+                            futures[executor.submit(self.get_dependencies_from_pom, package, version,
+                                                    repository_url)] = key
+
+                    # Ошибка загрузки запоминается: основной обход выведет ее без повторного запроса
+                    for future in as_completed(futures):
+                        try:
+                            self._dep_cache[futures[future]] = future.result()
+                        except Exception as e:
+                            self._dep_cache[futures[future]] = e
+
+                    next_frontier = []
+                    for package in frontier:
+                        dependencies = self._dep_cache.get((package, version, repository_url), ())
+                        if isinstance(dependencies, Exception):
+                            continue
+                        for dep in dependencies:
+                            if dep not in seen:
+                                seen.add(dep)
+                                next_frontier.append(dep)
+
+                    frontier = next_frontier
+                    depth += 1
         finally:
-            self.visiting.remove(package_name)
-            self.visited.add(package_name)
+            # Потоки пула завершены: их постоянные соединения больше не понадобятся
+            self._http.close_worker_connections()
 
-    def _process_cycles(self) -> None:
-        processed_cycles = set()
+    def _pop_component(self, root: str) -> None:
+        component = []
+        while True:
+            node = self._tarjan_stack.pop()
+            self._on_tarjan_stack.discard(node)
+            component.append(node)
+            if node == root:
+                break
 
-        for node, cycle_set in self.cycles.items():
-            if node in self.graph and cycle_set:
-                cycle_desc = f"CYCLE: {list(cycle_set)[0]}"
-                cycle_nodes = list(cycle_set)[0].split(" -> ")
+        # Описание цикла - первый найденный путь цикла; одиночный пакет без петли циклом не является
+        cycle_path = None
+        for node in reversed(component):
+            path = self._cycle_paths.pop(node, None)
+            if cycle_path is None:
+                cycle_path = path
 
-                first_cycle_node = min(cycle_nodes) if cycle_nodes else node
+        if cycle_path is None:
+            return
 
-                if node == first_cycle_node:
-                    self.graph[node] = [cycle_desc]
-                else:
-                    if node in self.original_dependencies:
-                        self.graph[node] = self.original_dependencies[node]
+        # Цикл хранится одним кортежем на компоненту, повернутым так, что первым идет минимальный
+        # по алфавиту пакет: он показывает информацию о цикле, остальные сохраняют оригинальные зависимости
+        cycle_desc = _Marker(f"CYCLE: {' -> '.join(cycle_path)}")
+        cycle_nodes = cycle_path[:-1]
+        start = cycle_nodes.index(min(cycle_nodes))
+        cycle = tuple(cycle_nodes[start:] + cycle_nodes[:start])
+        first_cycle_node = cycle[0]
+        for node in component:
+            self.cycles[node] = cycle
+            if node == first_cycle_node:
+                self.graph[node] = [cycle_desc]
+            elif node in self.original_dependencies:
+                self.graph[node] = self.original_dependencies[node]
 
     def display_dependency_graph(self, ascii_mode: bool = False) -> None:
         print("\n" + "-" * 60)
@@ -226,8 +529,7 @@ class DependencyGraph:
             ascii_visited = self.visited.copy()
             self.visited.clear()
 
-            start_package = next(iter(self.original_dependencies.keys())) if self.original_dependencies else next(
-                iter(self.graph.keys()))
+            start_package = self._root or next(iter(self.graph))
             self.display_ascii_tree(start_package)
 
             self.visited = ascii_visited
@@ -291,21 +593,8 @@ L:"""
 
     def get_all_packages_from_test_file(self, test_repo_path: str) -> List[str]:
         try:
-            if not os.path.exists(test_repo_path):
-                raise ValueError(f"Тестовый файл не найден: {test_repo_path}")
-
-            with open(test_repo_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-
-            packages = []
-            for line in content.split('\n'):
-                line = line.strip()
-                if line and ':' in line and not line.startswith('#'):
-                    pkg = line.split(':', 1)[0].strip()
-                    if pkg and pkg not in packages:
-                        packages.append(pkg)
-
-            return packages
+            # Ключи словаря - пакеты в порядке первого упоминания
+            return [pkg for pkg in self._load_test_repo(test_repo_path) if pkg]
 
         except Exception as e:
             raise ValueError(f"Ошибка чтения тестового файла: {e}")
@@ -325,7 +614,7 @@ L:"""
             if package not in self.visited:
                 self.build_dependency_graph(package, None, repository_url, is_test_mode)
 
-        self._process_cycles()
+        self._finalize_graph()
 
         print(f"Обработано пакетов: {len(self.visited)}/{total_packages}")
         print("Полный граф построен!")
@@ -365,54 +654,85 @@ L:"""
 
         print(f"\nАнализируем файл {file_path}...")
 
-        self.graph.clear()
-        self.visited.clear()
-        self.visiting.clear()
-        self.cycles.clear()
-        self.original_dependencies.clear()
+        self._reset()
 
         self.build_complete_dependency_graph(file_path, True)
 
         start_package = self.get_all_packages_from_test_file(file_path)[0]
         self.display_load_order(start_package)
 
-    def calculate_load_order(self, start_package: str) -> List[str]:
-        if not self.graph:
-            raise ValueError("Граф зависимостей не построен")
-
-        in_degree = defaultdict(int)
-        reverse_graph = defaultdict(list)
-
-        for package, dependencies in self.graph.items():
-            if package not in in_degree:
-                in_degree[package] = 0
+    def _finalize_graph(self) -> None:
+        # Номера пакетов: сначала пакеты графа (в порядке графа), затем зависимости вне графа
+        ids = {package: i for i, package in enumerate(self.graph)}
+        in_degree = array('i', [0]) * len(ids)
+        rev_count = [0] * len(ids)
 
+        for i, dependencies in enumerate(self.graph.values()):
             for dep in dependencies:
-                if not (dep.startswith("CYCLE:") or dep.startswith("ERROR:") or
-                        dep.startswith("FILTERED") or dep.startswith("MAX_DEPTH_REACHED")):
-                    reverse_graph[dep].append(package)
-                    in_degree[package] += 1
-
-        queue = deque()
-        load_order = []
+                if not isinstance(dep, _Marker):
+                    dep_id = ids.get(dep)
+                    if dep_id is None:
+                        dep_id = ids[dep] = len(rev_count)
+                        rev_count.append(0)
+                    rev_count[dep_id] += 1
+                    in_degree[i] += 1
+
+        # Обратные ребра зависимости dep_id - rev_edges[rev_offsets[dep_id]:rev_offsets[dep_id + 1]]
+        rev_offsets = array('i', [0]) * (len(rev_count) + 1)
+        for dep_id, count in enumerate(rev_count):
+            rev_offsets[dep_id + 1] = rev_offsets[dep_id] + count
+
+        rev_edges = array('i', [0]) * rev_offsets[-1]
+        position = rev_offsets[:-1]
+        for i, dependencies in enumerate(self.graph.values()):
+            for dep in dependencies:
+                if not isinstance(dep, _Marker):
+                    dep_id = ids[dep]
+                    rev_edges[position[dep_id]] = i
+                    position[dep_id] += 1
 
-        for package in self.graph:
-            if in_degree[package] == 0:
-                queue.append(package)
+        self._names = list(self.graph)
+        self._rev_offsets = rev_offsets
+        self._rev_edges = rev_edges
+        self._in_degree = in_degree
 
-        while queue:
-            current = queue.popleft()
-            load_order.append(current)
+    def calculate_load_order(self, start_package: str) -> List[str]:
+        if not self.graph:
+            raise ValueError("Граф зависимостей не построен")
 
-            for dependent in reverse_graph[current]:
+        # В графе без циклов порядок завершения обхода уже является порядком загрузки, если обход
+        # ни разу не обрывался: иначе оборванный пакет мог быть раскрыт позже другим корнем и завершиться
+        # после зависящих от него пакетов (а цикл через него - остаться не найденным). Тогда - алгоритм Кана
+        if not self.cycles and not self._truncated and len(self._finish_order) == len(self.graph):
+            return list(self._finish_order)
+
+        # Целочисленный граф строится один раз после построения графа;
+        # сортировка изменяет только копию полустепеней захода
+        if self._rev_offsets is None:
+            self._finalize_graph()
+        names = self._names
+        rev_offsets = self._rev_offsets
+        rev_edges = self._rev_edges
+        in_degree = array('i', self._in_degree)
+
+        # Список готовых пакетов одновременно служит очередью: head - индекс ее начала
+        order = [i for i in range(len(names)) if in_degree[i] == 0]
+        head = 0
+
+        while head < len(order):
+            current = order[head]
+            head += 1
+
+            for k in range(rev_offsets[current], rev_offsets[current + 1]):
+                dependent = rev_edges[k]
                 in_degree[dependent] -= 1
                 if in_degree[dependent] == 0:
-                    queue.append(dependent)
+                    order.append(dependent)
 
+        load_order = [names[i] for i in order]
         if len(load_order) != len(self.graph):
-            for package in self.graph:
-                if package not in load_order:
-                    load_order.append(package)
+            placed = set(load_order)
+            load_order.extend(package for package in self.graph if package not in placed)
 
         return load_order
 
@@ -428,9 +748,7 @@ L:"""
             # Получаем зависимости для стартового пакета
             dependencies = []
             if start_package in self.graph:
-                dependencies = [dep for dep in self.graph[start_package]
-                                if not (dep.startswith("CYCLE:") or dep.startswith("ERROR:") or
-                                        dep.startswith("FILTERED") or dep.startswith("MAX_DEPTH_REACHED"))]
+                dependencies = [dep for dep in self.graph[start_package] if not isinstance(dep, _Marker)]
 
             print(f"\nНайдено зависимостей для '{start_package.upper()}': {len(dependencies)} пакетов")
 
@@ -443,28 +761,7 @@ L:"""
             for i, package in enumerate(load_order, 1):
                 print(f"    {i}. {package}")
 
-            print("\nОБЪЯСНЕНИЕ ПОРЯДКА:")
-            print("-" * 40)
-            print("Порядок основан на топологической сортировке графа зависимостей.")
-            print("Каждый пакет загружается после всех своих зависимостей.")
-            print("Это гарантирует, что при загрузке пакета все его зависимости уже доступны.")
-
-            print("\nСРАВНЕНИЕ С РЕАЛЬНЫМИ МЕНЕДЖЕРАМИ ПАКЕТОВ:")
-            print("-" * 40)
-            print("В реальных менеджерах пакетов могут быть расхождения из-за:")
-            print("1. Учета версий зависимостей")
-            print("2. Разрешения конфликтов версий")
-            print("3. Оптимизации для параллельной загрузки")
-            print("4. Учета дополнительных метаданных пакетов")
-            print("5. Поддержки альтернативных зависимостей")
-            print("6. Кэширования уже загруженных пакетов")
-
-            print("\nВЕРОЯТНЫЕ РАСХОЖДЕНИЯ:")
-            print("-" * 40)
-            print("Cargo (Rust): Может объединять одинаковые версии зависимостей")
-            print("npm (Node.js): Использует плоскую структуру node_modules")
-            print("pip (Python): Учитывает совместимость версий Python")
-            print("Maven (Java): Учитывает scope зависимостей (compile/test/runtime)")
+            print(_LOAD_ORDER_NOTES)
 
             print("\nАНАЛИЗ ЗАВЕРШЕН УСПЕШНО!")
 
@@ -493,11 +790,7 @@ L:"""
                 print(f"Файл: {test_file}, Стартовый пакет: {start_pkg}")
                 print('=' * 60)
 
-                self.graph.clear()
-                self.visited.clear()
-                self.visiting.clear()
-                self.cycles.clear()
-                self.original_dependencies.clear()
+                self._reset()
 
                 try:
                     self.build_complete_dependency_graph(test_file, True)
@@ -511,11 +804,20 @@ L:"""
 
 
 def main():
+    args = [arg for arg in sys.argv[1:] if arg != "--verbose"]
+    # Обработчик и уровень задаются только логгеру depgraph, не корневому: --verbose не включает
+    # отладочный вывод сторонних библиотек
+    if not log.handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        log.addHandler(handler)
+    log.setLevel(logging.DEBUG if len(args) < len(sys.argv) - 1 else logging.WARNING)
+    log.propagate = False
     graph = DependencyGraph()
 
-    if len(sys.argv) > 1 and sys.argv[1] == "--interactive":
+    if args and args[0] == "--interactive":
         graph.interactive_test_mode()
-    elif len(sys.argv) > 1 and sys.argv[1] == "--demo":
+    elif args and args[0] == "--demo":
         graph.demonstrate_on_test_cases()
     else:
         try:
@@ -539,7 +841,6 @@ def main():
                     is_test_mode=False,
                     package_filter=config['package_filter']
                 )
-                graph._process_cycles()
 
             print("\n" + "=" * 70)
             print("РЕЖИМ ПОРЯДКА ЗАГРУЗКИ (ЭТАП 4)")
@@ -0,0 +1,339 @@
+import os  # Работа с файловой системой (проверка существования файлов)
+import re  # Регулярные выражения для проверки недопустимых символов
+import sys  # Системные функции (вывод сводки в stdout)
+from dataclasses import dataclass, field, fields  # Компактная неизменяемая запись конфигурации
+from typing import Dict, Any  # Аннотации типов для лучшей читаемости кода
+
+# Кэш проверенных конфигураций: (абсолютный путь, mtime_ns, размер) -> PackageConfig.
+# Повторная загрузка неизменённого файла стоит одного вызова os.stat.
+_CONFIG_CACHE: Dict[tuple, "PackageConfig"] = {}
+
+# Допустимые строковые значения булевых параметров (в нижнем регистре)
+_BOOL_MAP: Dict[str, bool] = ({k: True for k in ('true', 'yes', '1', 'on')} |
+                              {k: False for k in ('false', 'no', '0', 'off')})
+
+# Символы, запрещенные в пути тестового репозитория и в фильтре пакетов.
+# Один поиск по символьному классу заменяет отдельную проверку каждого символа.
+_INVALID_PATH_RE = re.compile(r'[<>:"|?*]')
+_INVALID_FILTER_RE = re.compile(r'[<>:"|?*@!]')
+
+# Разделитель ключа и значения в INI-файле: первый из '=' и ':' (как delimiters по умолчанию в configparser)
+_INI_DELIMITER_RE = re.compile(r'[=:]')
+
+# Значения по умолчанию для необязательных строковых параметров
+_DEFAULTS: Dict[str, str] = {
+    'test_repository_path': './test_repo',
+    'output_filename': 'dependency_graph.png',
+    'package_filter': '',  # Пустая строка - без фильтрации
+}
+
+# Поддерживаемые расширения файла с изображением графа
+_VALID_EXTS = frozenset({'.png', '.jpg', '.jpeg', '.svg', '.pdf'})
+
+
+# Пользовательское исключение для ошибок конфигурации
+# Наследуется от базового класса Exception
+class ConfigError(Exception):
+    pass
+
+
+# Загруженная и проверенная конфигурация.
+# frozen - объект неизменяем, поэтому его можно отдавать из кэша без копирования;
+# slots - доступ к полям без словаря атрибутов и меньший расход памяти.
+@dataclass(frozen=True, slots=True)
+class PackageConfig:
+    name: str  # Имя пакета в формате groupId:artifactId
+    version: str  # Версия пакета
+    repository_url: str  # URL Maven-репозитория
+    test_repository_mode: bool  # Режим работы с тестовым репозиторием
+    test_repository_path: str  # Путь к тестовому репозиторию
+    output_filename: str  # Имя файла с изображением графа
+    ascii_tree_mode: bool  # Режим вывода ASCII-дерева
+    package_filter: str  # Подстрока для фильтрации пакетов
+    # Производные поля: вычисляются из name и не выводятся в сводке (это не параметры пользователя)
+    group_id: str = field(metadata={'derived': True})  # groupId из имени пакета
+    artifact_id: str = field(metadata={'derived': True})  # artifactId из имени пакета
+
+
+# Поля сводки - только параметры, которые задает пользователь
+_SUMMARY_FIELDS = tuple(f.name for f in fields(PackageConfig) if not f.metadata.get('derived'))
+
+
+def _parse_ini(path: str) -> Dict[str, Dict[str, str]]:
+    # Однопроходное чтение INI-файла: секция -> {параметр: значение}.
+    # Заменяет configparser: нам нужна одна секция из нескольких ключей,
+    # интерполяция и прочие возможности configparser здесь не используются.
+    # Синтаксис тот же, что у configparser: разделители '=' и ':', повтор секции или
+    # параметра - ошибка (а не молчаливая перезапись).
+    sections: Dict[str, Dict[str, str]] = {}
+    current = None  # Текущая секция (None - до первого заголовка)
+
+    with open(path, 'r', encoding='utf-8', buffering=-1) as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            # Пропускаем пустые строки и комментарии
+            if not line or line[0] in '#;':
+                continue
+
+            # Заголовок секции: [имя]
+            if line[0] == '[':
+                if line[-1] != ']':
+                    raise ConfigError(f"Ошибка чтения конфигурационного файла: "
+                                      f"некорректный заголовок секции в строке {line_number}: {line!r}")
+                section = line[1:-1].strip()
+                if section in sections:
+                    raise ConfigError(f"Ошибка чтения конфигурационного файла: "
+                                      f"повторная секция [{section}] в строке {line_number}")
+                current = sections[section] = {}
+                continue
+
+            if current is None:
+                raise ConfigError(f"Ошибка чтения конфигурационного файла: "
+                                  f"параметр вне секции в строке {line_number}: {line!r}")
+
+            # Пара ключ = значение или ключ: значение (имена параметров, как и в configparser, без учета регистра)
+            delimiter = _INI_DELIMITER_RE.search(line)
+            if delimiter is None:
+                raise ConfigError(f"Ошибка чтения конфигурационного файла: "
+                                  f"ожидается 'ключ = значение' в строке {line_number}: {line!r}")
+            key = line[:delimiter.start()].strip().lower()
+            if key in current:
+                raise ConfigError(f"Ошибка чтения конфигурационного файла: "
+                                  f"повторный параметр '{key}' в строке {line_number}")
+            current[key] = line[delimiter.end():].strip()
+
+    return sections
+
+
+class DependencyGraphConfig:
+    # Основной класс для работы с конфигурацией графа зависимостей.
+    def __init__(self, config_path: str = "config.ini"):
+        # Инициализация объекта конфигурации.
+        self.config_path = config_path  # Сохраняем путь для последующего использования
+        self.config = None  # Здесь будет храниться загруженная конфигурация
+        self._summary_cached = None  # Отформатированная сводка (строится при первом выводе)
+
+    def load_config(self) -> PackageConfig:
+        # Основной метод загрузки конфигурации из INI-файла.
+
+        # Конфигурация уже загружена этим объектом - возвращаем ее без повторного чтения
+        if self.config is not None:
+            return self.config
+
+        # Проверка существования файла конфигурации ДО попытки чтения
+        if not os.path.exists(self.config_path):
+            raise ConfigError(f"Конфигурационный файл '{self.config_path}' не найден")
+
+        # Если файл не изменился с прошлой загрузки, возвращаем закэшированную конфигурацию
+        # (PackageConfig неизменяем, копия не нужна)
+        st = os.stat(self.config_path)
+        cache_key = (os.path.abspath(self.config_path), st.st_mtime_ns, st.st_size)
+        if cache_key in _CONFIG_CACHE:
+            self.config = _CONFIG_CACHE[cache_key]
+            self._summary_cached = None  # Конфигурация сменилась - сводку нужно построить заново
+            return self.config
+
+        try:
+            # Чтение файла с явным указанием кодировки UTF-8
+            # (ошибки формата _parse_ini сообщает сам через ConfigError)
+            sections = _parse_ini(self.config_path)
+        except (UnicodeDecodeError, OSError) as e:
+            # Ошибки кодировки (файл не в UTF-8) и ввода-вывода (нет прав, каталог вместо файла)
+            raise ConfigError(f"Ошибка чтения конфигурационного файла: {e}")
+
+        # Проверка наличия обязательной секции 'package'
+        if 'package' not in sections:
+            raise ConfigError("В конфигурационном файле отсутствует секция 'package'")
+
+        # Получаем доступ к секции 'package' для извлечения параметров
+        package_section = sections['package']
+        config = {}  # Словарь параметров, из которого после проверки строится PackageConfig
+
+        try:
+            # Обязательные параметры
+
+            # Имя пакета в формате groupId:artifactId
+            config['name'] = self._get_required_parameter(package_section, 'name')
+            # Версия пакета
+            config['version'] = self._get_required_parameter(package_section, 'version')
+            # URL Maven-репозитория для загрузки POM-файлов
+            config['repository_url'] = self._get_required_parameter(package_section, 'repository_url')
+
+            # Опциональные параметры
+
+            # Режим тестирования: использование локальных файлов вместо удаленного репозитория
+            config['test_repository_mode'] = self._get_boolean_parameter(
+                package_section, 'test_repository_mode', False  # По умолчанию False
+            )
+            config['test_repository_path'] = package_section.get(
+                'test_repository_path',
+                _DEFAULTS['test_repository_path']  # Значение по умолчанию
+            )
+
+            # Имя файла для сохранения графа зависимостей
+            config['output_filename'] = package_section.get(
+                'output_filename',
+                _DEFAULTS['output_filename']  # Значение по умолчанию
+            )
+
+            # Режим отображения графа в виде ASCII-дерева в консоли
+            config['ascii_tree_mode'] = self._get_boolean_parameter(
+                package_section, 'ascii_tree_mode', False  # По умолчанию False
+            )
+
+            # Фильтр пакетов - строка для исключения определенных пакетов из анализа
+            config['package_filter'] = package_section.get(
+                'package_filter',
+                _DEFAULTS['package_filter']  # Пустая строка по умолчанию (без фильтрации)
+            )
+
+        except ValueError as e:
+            # Обработка ошибок получения параметров
+            raise ConfigError(f"Ошибка в параметрах конфигурации: {e}")
+
+        # Дополнительная валидация значений конфигурации
+        self._validate_config(config)
+
+        # Сохраняем конфигурацию в атрибуте объекта и в кэше, затем возвращаем
+        package_config = PackageConfig(**config)
+        _CONFIG_CACHE[cache_key] = package_config
+        self.config = package_config
+        self._summary_cached = None  # Конфигурация сменилась - сводку нужно построить заново
+        return package_config
+
+    def print_summary(self) -> None:
+        # Вывод сводки загруженной конфигурации.
+        # Строка сводки форматируется один раз и переиспользуется при повторных вызовах.
+        if self._summary_cached is None:
+            self._summary_cached = _format_config_summary(self.load_config())
+        sys.stdout.write(self._summary_cached)
+
+    def _get_required_parameter(self, section: Dict[str, str], param: str) -> str:
+        # Вспомогательный метод для получения обязательных параметров.
+        # Проверяем наличие параметра в секции
+        if param not in section:
+            raise ConfigError(f"Обязательный параметр '{param}' отсутствует в конфигурационном файле")
+
+        # Получаем значение параметра
+        value = section.get(param)
+
+        # Значения очищаются от пробелов один раз при чтении файла (_parse_ini),
+        # поэтому строка из пробелов здесь уже пустая
+        if not value:
+            raise ConfigError(f"Обязательный параметр '{param}' не указан или пуст")
+
+        return value
+
+    def _get_boolean_parameter(self, section: Dict[str, str], param: str, default: bool) -> bool:
+        # Вспомогательный метод для получения булевых параметров.
+
+        # Если параметр отсутствует в секции, возвращаем значение по умолчанию
+        if param not in section:
+            return default
+
+        value = section.get(param)
+
+        # Если значение None, возвращаем значение по умолчанию
+        if value is None:
+            return default
+
+        # Преобразование строкового значения в булево одним поиском в словаре
+        result = _BOOL_MAP.get(value.lower())
+        if result is None:
+            # Если значение не распознано, выбрасываем исключение с подсказкой
+            raise ConfigError(
+                f"Некорректное булево значение для параметра '{param}': '{value}'. "
+                f"Ожидается: true/false, yes/no, 1/0, on/off")
+        return result
+
+    def _validate_config(self, config: Dict[str, Any]) -> None:
+        # Значения уже очищены от пробелов при чтении, повторный strip() не нужен
+        # Проверка имени пакета
+        name = config['name']
+        if not name:
+            raise ConfigError("Имя пакета не может быть пустым")
+
+        # Один вызов partition и проверяет формат, и дает groupId/artifactId для следующих этапов
+        group_id, sep, artifact_id = name.partition(':')
+        if not sep or not group_id or not artifact_id:
+            raise ConfigError(f"Некорректный формат имени пакета: '{name}'. Ожидается: groupId:artifactId")
+        config['group_id'] = group_id
+        config['artifact_id'] = artifact_id
+
+        # Проверка версии пакета
+        version = config['version']
+        if not version:
+            raise ConfigError("Версия пакета не может быть пустой")
+
+        # Проверка URL репозитория
+        repo_url = config['repository_url']
+        if not repo_url:
+            raise ConfigError("URL репозитория не может быть пустым")
+
+        # Базовая проверка корректности URL
+        if not repo_url.startswith(('http://', 'https://')):
+            raise ConfigError(f"Некорректный протокол URL репозитория: '{repo_url}'. Ожидается: http:// или https://")
+
+        # После протокола должен идти непустой хост (проверка без разбора URL через urlparse)
+        host_start = 8 if repo_url[4] == 's' else 7
+        host_end = repo_url.find('/', host_start)
+        if (host_end if host_end != -1 else len(repo_url)) == host_start:
+            raise ConfigError(f"В URL репозитория не указан хост: '{repo_url}'")
+
+        # Дополнительные проверки для тестового режима
+        if config['test_repository_mode']:
+            test_path = config['test_repository_path']
+            if not test_path:
+                raise ConfigError("Путь тестового репозитория не может быть пустым в тестовом режиме")
+
+            # Проверка пути на наличие запрещенных символов за один проход по строке
+            invalid_match = _INVALID_PATH_RE.search(test_path)
+            if invalid_match:
+                raise ConfigError(
+                    f"Путь тестового репозитория содержит недопустимый символ: '{invalid_match.group(0)}'")
+
+        # Проверка имени выходного файла
+        output_file = config['output_filename']
+        if not output_file:
+            raise ConfigError("Имя выходного файла не может быть пустым")
+
+        # Проверка, что выходной файл имеет поддерживаемое расширение изображения
+        # Извлекаем расширение файла без создания объекта Path, по тем же правилам, что Path.suffix:
+        # точка ищется только в последнем компоненте пути, а ведущая (".png") или
+        # завершающая ("graph.") точка расширением не считается
+        name_start = max(output_file.rfind('/'), output_file.rfind(os.sep)) + 1
+        dot = output_file.rfind('.')
+        file_ext = output_file[dot:].lower() if name_start < dot < len(output_file) - 1 else ''
+        if file_ext not in _VALID_EXTS:
+            raise ConfigError(f"Неподдерживаемое расширение файла: '{file_ext}'. "
+                              f"Допустимые: {', '.join(_VALID_EXTS)}")
+
+        # Проверка типа фильтра пакетов
+        package_filter = config['package_filter']
+        if not isinstance(package_filter, str):
+            raise ConfigError("Фильтр пакетов должен быть строкой")
+
+        # НОВАЯ ПРОВЕРКА: Валидация символов в фильтре пакетов
+        if package_filter:
+            # Запрещенные символы в фильтре пакетов (без повторов, в порядке появления)
+            found_invalid_chars = list(dict.fromkeys(_INVALID_FILTER_RE.findall(package_filter)))
+
+            if found_invalid_chars:
+                raise ConfigError(
+                    f"Фильтр пакетов содержит недопустимые символы: {', '.join(repr(c) for c in found_invalid_chars)}")
+
+
+def _format_config_summary(config: PackageConfig) -> str:
+    # Вся сводка - один список строк и один join (пустая строка в конце дает завершающий перевод строки)
+    separator = "-" * 50
+    return "\n".join([
+        separator, "СВОДКА КОНФИГУРАЦИИ", separator,
+        # Пользовательские параметры конфигурации в формате ключ-значение
+        *(f"{name:<25}: {getattr(config, name)}" for name in _SUMMARY_FIELDS),
+        separator, "",
+    ])
+
+
+def print_config_summary(config: PackageConfig) -> None:
+    # Вывод сводки произвольной конфигурации одним вызовом write
+    sys.stdout.write(_format_config_summary(config))
@@ -0,0 +1,234 @@
+import base64  # Заголовок авторизации на прокси-сервере
+import hashlib  # Имя файла кэша - хэш URL POM-файла
+import http.client  # Постоянные (keep-alive) HTTP-соединения с репозиторием
+import io  # Запись уже загруженного POM-файла в кэш через тот же поток
+import os  # Каталог кэша и атомарная замена файлов
+import tempfile  # Временный файл, в который POM-файл пишется до помещения в кэш
+import threading  # Идентификатор потока и блокировка таблицы соединений
+import time  # Пауза между повторами запроса, возраст записи кэша
+import urllib.request  # Настройки прокси из окружения (HTTP(S)_PROXY, no_proxy)
+from typing import BinaryIO, Dict, Optional, Tuple  # Аннотации типов
+from urllib.parse import SplitResult, urljoin, urlsplit  # Разбор URL и переходы по перенаправлениям
+
+# Общий HTTP-клиент и локальный кэш POM-файлов этапов 2-4 для загрузки из Maven-репозитория.
+
+# Таймаут запроса (секунды), предел перенаправлений, повторы при сетевых ошибках
+_HTTP_TIMEOUT = 10
+_MAX_REDIRECTS = 5
+_REDIRECT_CODES = frozenset({301, 302, 303, 307, 308})
+_HTTP_RETRIES = 3
+_RETRY_BACKOFF = 0.2
+
+# User-Agent передается с каждым запросом: часть репозиториев и прокси-серверов отклоняет запросы без него
+_USER_AGENT = 'depgraph/1.0 (Python http.client)'
+
+# Локальный кэш POM-файлов: исходные байты файла, имя - хэш полного URL (в него входит адрес
+# репозитория), и время жизни записи (секунды)
+_POM_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'depgraph', 'poms')
+_POM_CACHE_MAX_AGE = 24 * 60 * 60
+
+
+class HttpClient:
+    # GET-запросы по постоянным соединениям с переходом по перенаправлениям и повтором при сетевых ошибках.
+    # У каждого потока свои соединения (http.client не потокобезопасен); таблица соединений общая
+    # и изменяется только под блокировкой.
+
+    def __init__(self):
+        # (поток, схема, хост) -> (соединение, префикс пути запроса, заголовки запроса)
+        self._connections: Dict[Tuple[int, str, str], Tuple[http.client.HTTPConnection, str, Dict[str, str]]] = {}
+        self._lock = threading.Lock()
+        # Прокси-серверы по схеме URL, как их видит urllib (переменные окружения и настройки системы)
+        self._proxies = urllib.request.getproxies()
+
+    def get(self, url: str) -> http.client.HTTPResponse:
+        # GET-запрос с переходом по перенаправлениям. Тело ответа вызывающий код должен дочитать
+        # (или вызвать discard/abandon), иначе соединение нельзя использовать повторно
+        for _ in range(_MAX_REDIRECTS + 1):
+            parts = urlsplit(url)
+            path = f"{parts.path}?{parts.query}" if parts.query else parts.path
+            response = self._send_request(parts.scheme, parts.netloc, path or '/')
+
+            location = response.getheader('Location')
+            if response.status not in _REDIRECT_CODES or not location:
+                return response
+
+            # Перенаправление: тело ответа не нужно, идем по новому адресу
+            self.discard(response)
+            url = urljoin(url, location)
+
+        raise http.client.HTTPException(f"Слишком много перенаправлений: {url}")
+
+    def discard(self, response: http.client.HTTPResponse) -> None:
+        # Дочитывание ненужного тела ответа, чтобы освободить соединение
+        try:
+            response.read()
+        except (OSError, http.client.HTTPException):
+            # Соединение в неизвестном состоянии - закрываем
+            self.abandon()
+        finally:
+            response.close()
+
+    def abandon(self) -> None:
+        # Закрытие соединений текущего потока: ответ прочитан не до конца, повторно их использовать нельзя
+        thread_id = threading.get_ident()
+        with self._lock:
+            dropped = [self._connections.pop(key)[0] for key in list(self._connections) if key[0] == thread_id]
+        for connection in dropped:
+            connection.close()
+
+    def close_worker_connections(self) -> None:
+        # Закрытие соединений всех потоков, кроме текущего (после остановки пула потоков загрузки)
+        thread_id = threading.get_ident()
+        with self._lock:
+            dropped = [self._connections.pop(key)[0] for key in list(self._connections) if key[0] != thread_id]
+        for connection in dropped:
+            connection.close()
+
+    def close(self) -> None:
+        # Закрытие всех соединений
+        with self._lock:
+            dropped = [entry[0] for entry in self._connections.values()]
+            self._connections.clear()
+        for connection in dropped:
+            connection.close()
+
+    def _send_request(self, scheme: str, netloc: str, path: str) -> http.client.HTTPResponse:
+        # Запрос через соединение текущего потока; при сетевой ошибке - переподключение и повтор.
+        # Первый повтор сразу (обычно сервер закрыл простаивающее keep-alive соединение), далее с паузой
+        key = (threading.get_ident(), scheme, netloc)
+        for attempt in range(_HTTP_RETRIES + 1):
+            with self._lock:
+                entry = self._connections.get(key)
+            if entry is None:
+                entry = self._connect(scheme, netloc)
+                with self._lock:
+                    self._connections[key] = entry
+            connection, prefix, headers = entry
+            try:
+                connection.request('GET', prefix + path, headers=headers)
+                return connection.getresponse()
+            except (OSError, http.client.HTTPException):
+                connection.close()
+                with self._lock:
+                    self._connections.pop(key, None)
+                if attempt == _HTTP_RETRIES:
+                    raise
+                if attempt:
+                    time.sleep(_RETRY_BACKOFF * (2 ** (attempt - 1)))
+
+    def _connect(self, scheme: str, netloc: str) -> Tuple[http.client.HTTPConnection, str, Dict[str, str]]:
+        # Новое соединение с хостом напрямую или через прокси-сервер из окружения
+        headers = {'User-Agent': _USER_AGENT}
+        proxy = self._proxy_for(scheme, netloc)
+
+        if proxy is None:
+            connection_class = http.client.HTTPSConnection if scheme == 'https' else http.client.HTTPConnection
+            return connection_class(netloc, timeout=_HTTP_TIMEOUT), '', headers
+
+        proxy_headers = {}
+        if proxy.username:
+            credentials = f"{proxy.username}:{proxy.password or ''}".encode('utf-8')
+            proxy_headers['Proxy-Authorization'] = 'Basic ' + base64.b64encode(credentials).decode('ascii')
+
+        proxy_port = proxy.port or 80
+        if scheme == 'https':
+            # HTTPS через прокси: туннель CONNECT, внутри него TLS-соединение с репозиторием
+            connection = http.client.HTTPSConnection(proxy.hostname, proxy_port, timeout=_HTTP_TIMEOUT)
+            connection.set_tunnel(netloc, headers=proxy_headers)
+            return connection, '', headers
+
+        # HTTP через прокси: запрос отправляется прокси-серверу с полным URL
+        connection = http.client.HTTPConnection(proxy.hostname, proxy_port, timeout=_HTTP_TIMEOUT)
+        return connection, f"{scheme}://{netloc}", {**headers, **proxy_headers}
+
+    def _proxy_for(self, scheme: str, netloc: str) -> Optional[SplitResult]:
+        # Адрес прокси-сервера для схемы (None - соединяться напрямую, в том числе по no_proxy)
+        proxy = self._proxies.get(scheme)
+        if not proxy or urllib.request.proxy_bypass(netloc):
+            return None
+        return urlsplit(proxy if '://' in proxy else f"http://{proxy}")
+
+
+class CachingReader:
+    # Обертка над потоком ответа: все прочитанные байты параллельно пишутся во временный файл,
+    # который finish() помещает в кэш (или удаляет, если POM-файл прочитан не полностью)
+
+    def __init__(self, stream: BinaryIO, cache_file: BinaryIO, temp_path: str, cache_path: str):
+        self._stream = stream
+        self._cache_file = cache_file
+        self._temp_path = temp_path
+        self._cache_path = cache_path
+        self.failed = False
+
+    def read(self, size: int = -1) -> bytes:
+        chunk = self._stream.read(size)
+        if chunk and not self.failed:
+            try:
+                self._cache_file.write(chunk)
+            except OSError:
+                # Ошибка записи кэша не должна мешать загрузке
+                self.failed = True
+        return chunk
+
+    def finish(self, complete: bool) -> None:
+        # Атомарная замена: параллельный читатель не увидит недописанный файл
+        try:
+            self._cache_file.close()
+            if complete and not self.failed:
+                os.replace(self._temp_path, self._cache_path)
+            else:
+                os.remove(self._temp_path)
+        except OSError:
+            pass
+
+
+def pom_cache_path(pom_url: str) -> Optional[str]:
+    # Путь к файлу кэша POM-файла (None - не кэшируется: SNAPSHOT-версии изменяются в репозитории)
+    if pom_url.endswith('-SNAPSHOT.pom'):
+        return None
+    digest = hashlib.blake2b(pom_url.encode('utf-8'), digest_size=16).hexdigest()
+    return os.path.join(_POM_CACHE_DIR, f"{digest}.pom")
+
+
+def open_cached_pom(pom_url: str) -> Optional[BinaryIO]:
+    # Открытый файл POM-файла из кэша (None - записи нет или она устарела)
+    cache_path = pom_cache_path(pom_url)
+    if cache_path is None:
+        return None
+    try:
+        if time.time() - os.path.getmtime(cache_path) > _POM_CACHE_MAX_AGE:
+            return None
+        return open(cache_path, 'rb')
+    except OSError:
+        return None
+
+
+def drop_cached_pom(pom_url: str) -> None:
+    # Удаление поврежденной записи: при следующем запросе POM-файл будет скачан заново
+    cache_path = pom_cache_path(pom_url)
+    if cache_path is not None:
+        try:
+            os.remove(cache_path)
+        except OSError:
+            pass
+
+
+def caching_reader(stream: BinaryIO, pom_url: str) -> Optional[CachingReader]:
+    # Поток ответа с записью в кэш по мере чтения (None - POM-файл не кэшируется или кэш недоступен)
+    cache_path = pom_cache_path(pom_url)
+    if cache_path is None:
+        return None
+    try:
+        os.makedirs(_POM_CACHE_DIR, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=_POM_CACHE_DIR, suffix='.tmp')
+    except OSError:
+        return None
+    return CachingReader(stream, os.fdopen(fd, 'wb'), temp_path, cache_path)
+
+
+def store_cached_pom(pom_url: str, pom_content: bytes) -> None:
+    # Сохранение уже загруженного POM-файла в кэш (ошибки записи не мешают построению графа)
+    reader = caching_reader(io.BytesIO(pom_content), pom_url)
+    if reader is not None:
+        reader.read()
+        reader.finish(True)
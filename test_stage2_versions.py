@@ -0,0 +1,76 @@
+import unittest
+
+from Stage2 import _parse_version_ranges, _version_in_ranges, _version_key
+
+# Проверка сравнения версий и диапазонов Maven (Stage2): python -m unittest test_stage2_versions
+
+
+class VersionKeyTest(unittest.TestCase):
+    # Пары версий, которые должны быть равны
+    EQUAL = [
+        ('1.0', '1.0.0'),
+        ('1', '1.0'),
+        ('1.0-final', '1.0'),
+        ('1.0-ga', '1.0'),
+        ('1.0-release', '1.0'),
+        ('1.0.FINAL', '1.0'),
+        ('1.0-rc1', '1-rc1'),
+        ('1.0-alpha1', '1.0-a1'),
+    ]
+
+    # Пары (меньшая, большая)
+    ORDERED = [
+        ('1.0-alpha1', '1.0-beta1'),
+        ('1.0-beta1', '1.0-milestone1'),
+        ('1.0-milestone1', '1.0-rc1'),
+        ('1.0-rc1', '1.0-SNAPSHOT'),
+        ('1.0-SNAPSHOT', '1.0'),
+        ('1.0-rc1', '1.0-final'),
+        ('1.0', '1.0-sp1'),
+        ('1.0-sp1', '1.0.1'),
+        ('1.0-rc1', '1.0-rc2'),
+        ('1.9', '1.10'),
+        ('1.0', '1.0.1'),
+        ('1.0-ga', '1.0.1'),
+    ]
+
+    def test_equal(self):
+        for left, right in self.EQUAL:
+            with self.subTest(left=left, right=right):
+                self.assertEqual(_version_key(left), _version_key(right))
+
+    def test_ordered(self):
+        for lower, higher in self.ORDERED:
+            with self.subTest(lower=lower, higher=higher):
+                self.assertLess(_version_key(lower), _version_key(higher))
+
+
+class VersionRangesTest(unittest.TestCase):
+    # (спецификация диапазонов, версия, входит ли версия в диапазон)
+    CASES = [
+        ('[1.0,2.0)', '1.0', True),
+        ('[1.0,2.0)', '1.5', True),
+        ('[1.0,2.0)', '2.0', False),
+        ('[1.0,2.0)', '2.0-rc1', True),
+        ('(1.0,2.0]', '1.0', False),
+        ('(1.0,2.0]', '2.0', True),
+        ('(1.0,2.0]', '2.0-final', True),
+        ('(,1.5]', '0.1', True),
+        ('(,1.5]', '1.5.1', False),
+        ('[1.5,)', '1.5', True),
+        ('[1.5,)', '1.4', False),
+        ('[1.2]', '1.2', True),
+        ('[1.2]', '1.2.0', True),
+        ('[1.2]', '1.2.1', False),
+        ('(,1.0],[1.2,)', '1.1', False),
+        ('(,1.0],[1.2,)', '1.3', True),
+    ]
+
+    def test_ranges(self):
+        for spec, version, expected in self.CASES:
+            with self.subTest(spec=spec, version=version):
+                self.assertEqual(_version_in_ranges(_version_key(version), _parse_version_ranges(spec)), expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,50 @@
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+
+from Stage4 import DependencyGraph
+
+# Проверка порядка загрузки (Stage4): python -m unittest test_stage4_load_order
+
+
+class LoadOrderTest(unittest.TestCase):
+    # (описание, строки тестового файла) - графы без циклов
+    ACYCLIC = [
+        ('цепочка глубже max_depth', [f"N{i}: N{i + 1}" for i in range(15)] + ["N15:"]),
+        ('цепочка из середины', ["N5: N6"] + [f"N{i}: N{i + 1}" for i in range(15)] + ["N15:"]),
+        ('ромб', ["A: B, C", "B: D", "C: D", "D:"]),
+    ]
+
+    def build(self, lines):
+        # Граф строится по временному тестовому файлу, вывод построения подавляется
+        with tempfile.NamedTemporaryFile('w', suffix='.txt', delete=False, encoding='utf-8') as f:
+            f.write("\n".join(lines))
+        self.addCleanup(os.remove, f.name)
+
+        graph = DependencyGraph()
+        with contextlib.redirect_stdout(io.StringIO()):
+            graph.build_complete_dependency_graph(f.name, True)
+        return graph
+
+    def test_dependencies_load_first(self):
+        for description, lines in self.ACYCLIC:
+            with self.subTest(description):
+                graph = self.build(lines)
+                order = graph.calculate_load_order(lines[0].split(':')[0])
+                self.assertCountEqual(order, graph.graph)
+
+                position = {package: i for i, package in enumerate(order)}
+                for package, dependencies in graph.graph.items():
+                    for dep in dependencies:
+                        if dep in position:
+                            self.assertLess(position[dep], position[package], f"{dep} -> {package}")
+
+    def test_deep_chain_order(self):
+        graph = self.build([f"N{i}: N{i + 1}" for i in range(15)] + ["N15:"])
+        self.assertEqual(graph.calculate_load_order('N0'), [f"N{i}" for i in range(15, -1, -1)])
+
+
+if __name__ == '__main__':
+    unittest.main()